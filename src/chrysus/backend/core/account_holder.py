@@ -1,99 +1,22 @@
-from typing import Optional, List
-from chrysus.backend.core.informed_table import InformedTable, clean_for_json
-import pandas as pd
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, List, Tuple
+from chrysus.backend.core.informed_table import InformedTable
 from chrysus.utils.logger import get_logger
-from chrysus.backend.core.available_models import gemini_2_5
-import json
+from chrysus.backend.core.available_models import get_model, model_id
+from chrysus.backend.core.prompt_builder import build_recommendation_prompt
+from chrysus.backend.core.json_response import dumps, make_etag, dataframe_to_records
+from chrysus.backend.core.transaction_query import DateIndex, query_transactions
+from chrysus.backend.core.arrow_export import iter_arrow_table, transactions_to_arrow
 import re
+import threading
 
 
 logger = get_logger(__name__)
 
+# bump whenever _RECOMMENDATION_PROMPT or the encoding of the client data changes so cached recommendations aren't reused
+RECOMMENDATION_PROMPT_VERSION = "2"
 
-class AccountHolder:
-
-    def __init__(self, name: str = None, account_ids: set = set()):
-        self.name = name
-        self.account_ids = set(account_ids)
-        self.descriptive_tables: List[InformedTable] = []
-        self.transaction_table: Optional[InformedTable] = None
-
-    def add_descriptive_table(self, table: InformedTable):
-        self.descriptive_tables.append(table)
-
-    def add_transaction_table(self, table: InformedTable):
-        logger.info(f"Adding transaction table: {table.is_transaction_table}")
-        if self.transaction_table is not None:
-            self.transaction_table = InformedTable.unify_tables(self.transaction_table, table)
-        else:
-            self.transaction_table = table
-
-    def add_table(self, table: InformedTable):
-        logger.info(f"Adding table: {table.is_transaction_table}")
-        if table.is_transaction_table:
-            self.add_transaction_table(table)
-        else:
-            self.add_descriptive_table(table)
-        if self.name is None:
-            self.name = table.user_information.get("name", None)
-        self.account_ids.add(table.user_information.get("account_number", None))
-
-    def get_base_insights(self):
-        if self.transaction_table is None:
-            return None
-        if len(self.transaction_table.insights) > 0:
-            return clean_for_json(self.transaction_table.insights['transaction_features'])
-        else:
-            return clean_for_json(self.transaction_table.extract_transaction_features())
-
-    def get_transaction_table_json(self):
-        if self.transaction_table is None:
-            return None
-        df = self.transaction_table.table.copy()
-        for col in df.columns:
-            if pd.api.types.is_datetime64_any_dtype(df[col]):
-                df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        return clean_for_json(df.to_dict(orient="records"))
-
-    def get_descriptive_tables_json(self):
-        if not self.descriptive_tables:
-            return []
-        
-        tables_json = []
-        for index, table in enumerate(self.descriptive_tables):
-            df = table.table.copy()
-            for col in df.columns:
-                if pd.api.types.is_datetime64_any_dtype(df[col]):
-                    df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Get the table title from user_information description, or use default
-            table_title = table.user_information.get('title', f'Descriptive Table {index + 1}')
-            
-            table_data = {
-                'title': table_title,
-                'data': clean_for_json(df.to_dict(orient="records"))
-            }
-            
-            tables_json.append(table_data)
-        
-        return tables_json
-        
-    def get_recommendations(self):
-        base_insights = self.get_base_insights()
-        descriptive_tables = self.get_descriptive_tables_json()
-        transaction_table = self.get_transaction_table_json()
-
-        if not base_insights or not transaction_table:
-            return {"error": "Insufficient data for recommendation."}
-
-        # The clean_for_json function might have already converted these to strings
-        # but we ensure they are proper JSON strings for the prompt.
-        base_insights_json = json.dumps(base_insights, indent=2)
-        descriptive_tables_json = json.dumps(descriptive_tables, indent=2)
-        transaction_table_json = json.dumps(transaction_table, indent=2)
-
-        prompt = f"""
+# filled by build_recommendation_prompt with the compact encodings of the client data
+_RECOMMENDATION_PROMPT = """
 <task>
 You are a senior loan officer. Your task is to analyze a client's financial data to determine if they are a suitable candidate for a small business style loan.
 You must provide a clear recommendation: "ACCEPT" or "REJECT" or "DEFER".
@@ -116,21 +39,23 @@ coin toss on whether they would be able to pay back the loan, you should defer t
     -   **Weaknesses**: A bulleted list of the client's financial weaknesses.
     -   **Evidence**: A list of specific transactions or data points that justify your conclusion.
 
+Tables in the client data are tab separated with a header row; each section is introduced by its name in brackets.
+
 You MUST respond strictly within the provided XML tags.
 </task>
 
 <client_data>
 
 <base_insights>
-{base_insights_json}
+{base_insights}
 </base_insights>
 
 <descriptive_tables>
-{descriptive_tables_json}
+{descriptive_tables}
 </descriptive_tables>
 
 <transaction_table>
-{transaction_table_json}
+{transaction_table}
 </transaction_table>
 
 </client_data>
@@ -141,8 +66,214 @@ You MUST respond strictly within the provided XML tags.
 </recommendation>
 </output>
 """
+
+
+class HolderSnapshot(NamedTuple):
+    """
+    An immutable view of a holder's data. Writers publish a new snapshot instead of mutating the
+    tables readers may be using, so one snapshot is always internally consistent.
+    """
+    data_version: int
+    transaction_table: Optional[InformedTable]
+    descriptive_tables: Tuple[InformedTable, ...]
+
+
+class AccountHolder:
+
+    def __init__(self, name: str = None, account_ids: set = set()):
+        self.name = name
+        self.account_ids = set(account_ids)
+        # serializes writers (merging new tables, saving); readers never take it
+        self.lock = threading.RLock()
+        # set for holders restored from storage: reads the tables in on first access
+        self._loader: Optional[Callable[["AccountHolder"], None]] = None
+        self._load_lock = threading.Lock()
+        # data_version is bumped on every added table; anything derived from the holder's data is valid for one version
+        self._snapshot = HolderSnapshot(0, None, ())
+        # view name -> (data_version, body, etag) of the serialized read endpoints
+        self._serialized: Dict[str, Tuple[int, bytes, str]] = {}
+        self._date_index: Optional[Tuple[int, DateIndex]] = None
+
+    def _ensure_loaded(self) -> None:
+        if self._loader is None:
+            return
+        with self._load_lock:
+            if self._loader is not None:
+                self._loader(self)
+                self._loader = None
+
+    def restore(self, transaction_table: Optional[InformedTable], descriptive_tables: List[InformedTable]) -> None:
+        """
+        Install tables read back from storage, keeping the stored data version.
+        """
+        self._snapshot = HolderSnapshot(self._snapshot.data_version, transaction_table, tuple(descriptive_tables))
+
+    def snapshot(self) -> HolderSnapshot:
+        self._ensure_loaded()
+        return self._snapshot
+
+    @property
+    def data_version(self) -> int:
+        return self._snapshot.data_version
+
+    @data_version.setter
+    def data_version(self, version: int):
+        self._snapshot = self._snapshot._replace(data_version=version)
+
+    @property
+    def descriptive_tables(self) -> Tuple[InformedTable, ...]:
+        return self.snapshot().descriptive_tables
+
+    @property
+    def transaction_table(self) -> Optional[InformedTable]:
+        return self.snapshot().transaction_table
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loader is None
+
+    def add_descriptive_table(self, table: InformedTable):
+        with self.lock:
+            current = self.snapshot()
+            self._snapshot = current._replace(
+                data_version=current.data_version + 1,
+                descriptive_tables=(*current.descriptive_tables, table),
+            )
+
+    def add_transaction_table(self, table: InformedTable):
+        logger.info(f"Adding transaction table: {table.is_transaction_table}")
+        with self.lock:
+            current = self.snapshot()
+            if current.transaction_table is not None:
+                # append into a copy with its own row store and feature state, so readers holding the
+                # current snapshot keep a consistent table; published tables are never modified
+                merged = current.transaction_table.copy_for_append()
+                merged.append_transactions(table)
+            else:
+                merged = table
+                merged.index_transactions()
+            self._snapshot = current._replace(data_version=current.data_version + 1, transaction_table=merged)
+
+    def add_table(self, table: InformedTable):
+        logger.info(f"Adding table: {table.is_transaction_table}")
+        with self.lock:
+            if table.is_transaction_table:
+                self.add_transaction_table(table)
+            else:
+                self.add_descriptive_table(table)
+            if self.name is None:
+                self.name = table.user_information.get("name", None)
+            self.account_ids = self.account_ids | {table.user_information.get("account_number", None)}
+
+    def recommendation_cache_key(self) -> Tuple:
+        return (self.name, self.data_version, RECOMMENDATION_PROMPT_VERSION, model_id("gemini_2_5"))
+
+    def get_serialized(self, view: str) -> Tuple[bytes, str]:
+        """
+        JSON bytes and strong ETag of a read view ("base_insights", "transaction_table" or "descriptive_tables"),
+        built once per data version from one snapshot and served as-is until a table is added.
+        """
+        snapshot = self.snapshot()
+        cached = self._serialized.get(view)
+        if cached is not None and cached[0] == snapshot.data_version:
+            return cached[1], cached[2]
+        builders: Dict[str, Callable[[HolderSnapshot], Any]] = {
+            "base_insights": self._base_insights,
+            "transaction_table": self._transaction_table_records,
+            "descriptive_tables": self._descriptive_tables_records,
+        }
+        body = dumps(builders[view](snapshot))
+        etag = make_etag(body)
+        self._serialized[view] = (snapshot.data_version, body, etag)
+        return body, etag
+
+    def get_serialized_etag(self, view: str) -> Optional[str]:
+        cached = self._serialized.get(view)
+        return cached[2] if cached is not None and cached[0] == self.data_version else None
+
+    @staticmethod
+    def _base_insights(snapshot: HolderSnapshot):
+        if snapshot.transaction_table is None:
+            return None
+        # never extract_transaction_features here: readers mustn't modify a published table
+        return snapshot.transaction_table.transaction_features()
+
+    @staticmethod
+    def _transaction_table_records(snapshot: HolderSnapshot):
+        if snapshot.transaction_table is None:
+            return None
+        return dataframe_to_records(snapshot.transaction_table.table)
+
+    @staticmethod
+    def _descriptive_tables_records(snapshot: HolderSnapshot):
+        tables_json = []
+        for index, table in enumerate(snapshot.descriptive_tables):
+            # Get the table title from user_information description, or use default
+            table_title = table.user_information.get('title', f'Descriptive Table {index + 1}')
+            
+            table_data = {
+                'title': table_title,
+                'data': dataframe_to_records(table.table)
+            }
+            
+            tables_json.append(table_data)
+        
+        return tables_json
+
+    def get_base_insights(self):
+        return self._base_insights(self.snapshot())
+
+    def get_transaction_table_json(self):
+        return self._transaction_table_records(self.snapshot())
+
+    def get_descriptive_tables_json(self):
+        return self._descriptive_tables_records(self.snapshot())
+
+    def _get_date_index(self, snapshot: HolderSnapshot) -> DateIndex:
+        """
+        Date index of the snapshot's transaction table, rebuilt once per data version.
+        """
+        date_index = self._date_index
+        if date_index is None or date_index[0] != snapshot.data_version:
+            date_index = (snapshot.data_version, DateIndex(snapshot.transaction_table.table["date"]))
+            self._date_index = date_index
+        return date_index[1]
+
+    def query_transaction_table(self, **query) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Records of the transactions matching a query, see transaction_query.query_transactions for the parameters.
+        :return: (Tuple[List[Dict[str, Any]], int, int]): The page of records, the number of matching rows and the data version they were read at.
+        """
+        snapshot = self.snapshot()
+        page, total = query_transactions(snapshot.transaction_table.table, self._get_date_index(snapshot), **query)
+        return dataframe_to_records(page), total, snapshot.data_version
+
+    def export_transaction_table(self, fmt: str = "arrow") -> Iterator[bytes]:
+        """
+        Stream the transaction table as an Arrow IPC stream ("arrow") or a Parquet file ("parquet"),
+        with typed timestamp, numeric and dictionary-encoded tag columns.
+        """
+        return iter_arrow_table(transactions_to_arrow(self.transaction_table.table), fmt)
+
+    def get_recommendations(self):
+        snapshot = self.snapshot()
+        base_insights = self._base_insights(snapshot)
+        if not base_insights or snapshot.transaction_table is None or snapshot.transaction_table.table.empty:
+            return {"error": "Insufficient data for recommendation."}
+
+        descriptive_tables = [
+            (table.user_information.get('title', f'Descriptive Table {index + 1}'), table.table)
+            for index, table in enumerate(snapshot.descriptive_tables)
+        ]
+        built = build_recommendation_prompt(
+            _RECOMMENDATION_PROMPT,
+            base_insights,
+            descriptive_tables,
+            snapshot.transaction_table.table,
+        )
+        prompt = built["prompt"]
         try:
-            llm = gemini_2_5
+            llm = get_model("gemini_2_5")
             response = llm.invoke(prompt)
             
             # Parse all the XML components from the response
@@ -158,7 +289,9 @@ You MUST respond strictly within the provided XML tags.
                     "reasoning": reasoning_match.group(1).strip() if reasoning_match else "",
                     "strengths": strengths_match.group(1).strip() if strengths_match else "",
                     "weaknesses": weaknesses_match.group(1).strip() if weaknesses_match else "",
-                    "evidence": evidence_match.group(1).strip() if evidence_match else ""
+                    "evidence": evidence_match.group(1).strip() if evidence_match else "",
+                    "prompt_tokens": built["token_counts"],
+                    "transaction_rows": built["transaction_rows"],
                 }
                 return result
             else:
@@ -1,50 +1,158 @@
-import copy
+import asyncio
+import threading
 from chrysus.backend.core.table_extractor import TableExtractor
 from pathlib import Path
 from chrysus.backend.core.informed_table import InformedTable
 from chrysus.backend.core.llm_extractor import LLMExtractor
-from typing import Dict
+from typing import Dict, Iterator, List, Any, Optional
 from chrysus.backend.core.account_holder import AccountHolder
+from chrysus.backend.core.arrow_export import iter_bulk_export
+from chrysus.backend.core.holder_storage import HolderStorage
+from chrysus.backend.core.ingestion_pool import IngestionProcessPool, build_table
+from chrysus.backend.core.job_queue import ProgressCallback
 from chrysus.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+
+def _report(progress: Optional[ProgressCallback], stage: str, state: str, completed: Optional[int] = None, total: Optional[int] = None) -> None:
+    if progress is not None:
+        progress(stage, state, completed, total)
+
 class AccountsController:
 
-    def __init__(self, table_extractor: TableExtractor = LLMExtractor()):
+    def __init__(self, table_extractor: Optional[TableExtractor] = None, storage: Optional[HolderStorage] = None, ingestion_pool: Optional[IngestionProcessPool] = None):
+        """
+        :param table_extractor: (TableExtractor | None): Defaults to an LLMExtractor, built on the first extraction.
+        :param ingestion_pool: (IngestionProcessPool | None): Build tables in worker processes during async ingestion instead of on threads.
+        """
         self.account_holder_map: Dict[str, AccountHolder] = {}
-        self.table_extractor = table_extractor
+        self._table_extractor = table_extractor
         self.identifiers = {}
+        self.storage = storage
+        self.ingestion_pool = ingestion_pool
+        # guards account_holder_map and identifiers; merging into a holder takes that holder's lock instead
+        self._lock = threading.Lock()
+
+    @property
+    def table_extractor(self) -> TableExtractor:
+        if self._table_extractor is None:
+            self._table_extractor = LLMExtractor()
+        return self._table_extractor
+
+    def load_from_storage(self) -> None:
+        """
+        Restore holders and identifiers from storage. Holders come back as lazy stubs, so this only reads metadata.
+        """
+        if self.storage is None:
+            return
+        holders, identifiers = self.storage.load_all()
+        with self._lock:
+            self.account_holder_map.update(holders)
+            self.identifiers.update(identifiers)
+
+    def _persist(self, holder: AccountHolder) -> None:
+        if self.storage is None:
+            return
+        try:
+            self.storage.save_holder(holder)
+            with self._lock:
+                identifiers = dict(self.identifiers)
+            self.storage.save_identifiers(identifiers)
+        except Exception as e:
+            # the holder is still served from memory; it'll be saved again with its next statement
+            logger.error(f"Failed to persist account holder {holder.name}: {e}")
 
     def extract_tables_from_pdf_and_add_to_self(self, pdf_path: Path):
         new_tables = self.table_extractor.extract(pdf_path)
+        self.add_extracted_tables_to_self(new_tables, pdf_path)
+
+    async def aextract_tables_from_pdf_and_add_to_self(self, pdf_path: Path, progress: Optional[ProgressCallback] = None) -> Optional[str]:
+        """
+        Async ingestion: extraction is awaited natively, the CPU-bound table building runs in the ingestion
+        pool's worker processes if there is one, on the default executor otherwise.
+        :param progress: (ProgressCallback | None): Called as progress(stage, state, completed, total) as the stages advance.
+        :return: (str | None): The name of the account holder the tables were added to.
+        """
+        _report(progress, "extraction", "running")
+        new_tables = await self.table_extractor.aextract(pdf_path)
+        _report(progress, "extraction", "done", len(new_tables), len(new_tables))
+        if self.ingestion_pool is None:
+            return await asyncio.to_thread(self.add_extracted_tables_to_self, new_tables, pdf_path, progress)
+        _report(progress, "classification", "running", 0, len(new_tables))
+        built_tables = await self.ingestion_pool.build_tables(new_tables, pdf_path)
+        _report(progress, "classification", "done", len(new_tables), len(new_tables))
+        return await asyncio.to_thread(self.merge_built_tables, built_tables, pdf_path, progress)
+
+    def add_extracted_tables_to_self(self, new_tables: List[Dict[str, Any]], pdf_path: Path, progress: Optional[ProgressCallback] = None) -> Optional[str]:
+        """
+        Build InformedTables from extracted tables and merge them into their account holder.
+        Safe to call concurrently: building (date fixing, classification) runs without locks, the
+        holder lookup takes the controller lock and only the merge takes the holder's own lock, so
+        ingestions for different holders never wait on each other.
+        :return: (str | None): The name of the account holder the tables were added to.
+        """
+        built_tables = []
+        for i, table in enumerate(new_tables):
+            _report(progress, "classification", "running", i, len(new_tables))
+            built_tables.append(build_table(table, pdf_path))
+        _report(progress, "classification", "done", len(new_tables), len(new_tables))
+        return self.merge_built_tables(built_tables, pdf_path, progress)
+
+    def merge_built_tables(self, built_tables: List[InformedTable], pdf_path: Path, progress: Optional[ProgressCallback] = None) -> Optional[str]:
+        """
+        Merge already built tables into their account holder under the holder's lock.
+        :return: (str | None): The name of the account holder the tables were added to.
+        """
+        holder = self._resolve_holder(built_tables)
+        if holder is None:
+            logger.error(f"Found no name in {pdf_path}")
+            _report(progress, "merge", "failed")
+            return None
+
+        with holder.lock:
+            for i, table in enumerate(built_tables):
+                _report(progress, "merge", "running", i, len(built_tables))
+                holder.add_table(table)
+            # under the holder lock so saves of the same holder land in version order
+            self._persist(holder)
+        _report(progress, "merge", "done", len(built_tables), len(built_tables))
+        return holder.name
+
+    def _resolve_holder(self, tables: List[InformedTable]) -> Optional[AccountHolder]:
+        """
+        Find the holder the tables belong to: the first table naming a holder, or whose account
+        number is already known, decides. Account numbers seen before that are mapped to the holder.
+        The holder is created if it doesn't exist yet.
+        """
         cur_name = None
-        stack_of_data = []
         account_numbers = set()
-        for table in new_tables:
-            cur_table = InformedTable(table['table'], copy.deepcopy(table['user_information']), pdf_path)
-            cur_table.user_information['title'] = table.get('title', 'main table')
-            if cur_name is None and cur_table.user_information.get("name", None) is not None:
-                cur_name = cur_table.user_information.get("name", None)
-            elif cur_name is None and cur_table.user_information.get("account_number", None) is not None:
-                account_numbers.add(cur_table.user_information.get("account_number", None))
-                cur_name = self.identifiers.get(cur_table.user_information.get("account_number", None), None) 
-            if cur_name is not None:
-                if self.account_holder_map.get(cur_name, None) is not None:
-                    self.account_holder_map[cur_name].add_table(cur_table)
-                else:
-                    self.account_holder_map[cur_name] = AccountHolder(name=cur_name, account_ids=set([cur_table.user_information.get("account_number", None)]))
-                    self.account_holder_map[cur_name].add_table(cur_table)
-            else:
-                stack_of_data.append(cur_table)
-        if cur_name is None:
-            logger.error(f"Found no name in {pdf_path}")
-            return
-        for table in stack_of_data:
-            self.account_holder_map[cur_name].add_table(cur_table)
-            for i in account_numbers:
-                self.identifiers[i] = cur_name
-    
+        with self._lock:
+            for table in tables:
+                name = table.user_information.get("name", None)
+                account_number = table.user_information.get("account_number", None)
+                if name is not None:
+                    cur_name = name
+                    break
+                if account_number is not None:
+                    account_numbers.add(account_number)
+                    cur_name = self.identifiers.get(account_number, None)
+                    if cur_name is not None:
+                        break
+            if cur_name is None:
+                return None
+            for account_number in account_numbers:
+                self.identifiers[account_number] = cur_name
+            holder = self.account_holder_map.get(cur_name, None)
+            if holder is None:
+                holder = AccountHolder(name=cur_name)
+                self.account_holder_map[cur_name] = holder
+            return holder
+
+    def holder_names(self) -> List[str]:
+        with self._lock:
+            return list(self.account_holder_map.keys())
+
     def get_account_holder(self, name: str = None, account_number: str = None) -> AccountHolder:
         if name is not None:
             return self.account_holder_map.get(name, None)
@@ -52,4 +160,34 @@ class AccountsController:
             return self.account_holder_map.get(self.identifiers.get(account_number, None), None)
         else:
             return None
-        
\ No newline at end of file
+        
+    def holds_job_data(self, job: Dict[str, Any]) -> bool:
+        """
+        Whether the tables a succeeded ingestion job added are still held, in memory or in storage.
+        They aren't once a restart dropped in-memory holders or the holder's stored tables were lost,
+        and the statement can then be ingested again.
+        :param job: (Dict[str, Any]): An ingestion job, see job_queue.JobStore.
+        """
+        name = (job.get("result") or {}).get("holder")
+        holder = self.get_account_holder(name) if name is not None else None
+        if holder is None:
+            return False
+        if not holder.is_loaded and self.storage is not None:
+            return self.storage.holds_pdf(name, job["pdf_path"])
+        snapshot = holder.snapshot()
+        tables = ([snapshot.transaction_table] if snapshot.transaction_table is not None else []) + list(snapshot.descriptive_tables)
+        return any(str(job["pdf_path"]) in table.pdf_path for table in tables)
+
+    def export_transaction_tables(self, fmt: str = "arrow") -> Iterator[bytes]:
+        """
+        Stream the transaction tables of every holder as one dataset partitioned by holder,
+        see arrow_export.iter_bulk_export for the layout of each format.
+        """
+        with self._lock:
+            holders = list(self.account_holder_map.items())
+        holder_tables = [
+            (name, snapshot.transaction_table.table)
+            for name, snapshot in ((name, holder.snapshot()) for name, holder in holders)
+            if snapshot.transaction_table is not None
+        ]
+        return iter_bulk_export(holder_tables, fmt)
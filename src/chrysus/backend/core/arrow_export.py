@@ -0,0 +1,219 @@
+import json
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+EXPORT_FORMATS = ("arrow", "parquet")
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "zip": "application/zip",
+}
+# low-cardinality text columns written as dictionary (categorical) arrays
+_CATEGORY_COLUMNS = {"tag", "holder"}
+# fixed index width so dictionary columns of different holders share one type
+_DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+_BATCH_ROWS = 64 * 1024
+
+
+class _ChunkSink:
+    """
+    Write-only file that hands out what was written since the last drain, so writers can be streamed.
+    It tracks its own position for writers that need tell(), and has no seek(), which puts zipfile in streaming mode.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# schema metadata key mapping each column to its pandas dtype in the DataFrame
+_DTYPES_KEY = b"chrysus.dtypes"
+# infer_dtype kinds Arrow can type without changing the values; everything else is stringified
+_TYPED_OBJECT_KINDS = {"string", "empty", "integer", "floating", "boolean", "decimal", "bytes", "date", "datetime"}
+
+
+def _is_null(value) -> bool:
+    return value is None or value is pd.NaT or (isinstance(value, float) and value != value)
+
+
+def _object_column_to_arrow(series: pd.Series) -> pa.Array:
+    """
+    Type an object column by what it holds: numbers stay numeric, text becomes strings, dates and
+    datetimes become dates and timestamps, ints next to floats become floats (which fingerprint the same,
+    see transaction_store.row_fingerprints). Only truly mixed columns (e.g. numbers next to text) are
+    stringified, with str() per value so they hash as pandas hashes mixed object columns.
+    """
+    kind = pd.api.types.infer_dtype(series, skipna=True)
+    if kind == "mixed-integer-float":
+        return pa.array(pd.to_numeric(series, errors="coerce").astype("float64"), from_pandas=True)
+    if kind in _TYPED_OBJECT_KINDS:
+        try:
+            return pa.array(series.to_numpy(dtype=object), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            pass
+    return pa.array([None if _is_null(value) else str(value) for value in series.to_numpy(dtype=object)], type=pa.string())
+
+
+def frame_to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Arrow form of an internal table for storage or shipping between processes. Typed columns keep
+    their type; object columns (LLM extracted amounts and balances are often python numbers in object
+    columns) are typed by their values. The pandas dtypes go in the schema metadata so arrow_to_frame
+    brings every column back with its dtype, object columns holding the same python values.
+    Nulls in object columns come back as None.
+    """
+    arrays, names, dtypes = [], [], {}
+    for column in df.columns:
+        series = df[column]
+        arrays.append(_object_column_to_arrow(series) if series.dtype == object else pa.Array.from_pandas(series))
+        names.append(str(column))
+        dtypes[str(column)] = str(series.dtype)
+    return pa.table(arrays, names=names, metadata={_DTYPES_KEY: json.dumps(dtypes).encode("utf-8")})
+
+
+def arrow_to_frame(table: pa.Table) -> pd.DataFrame:
+    metadata = table.schema.metadata or {}
+    dtypes = json.loads(metadata[_DTYPES_KEY]) if _DTYPES_KEY in metadata else {}
+    frame = table.to_pandas(ignore_metadata=True)
+    for column, dtype in dtypes.items():
+        if dtype == "object":
+            arrow_column = table.column(column)
+            values = arrow_column.to_pylist()
+            if pa.types.is_timestamp(arrow_column.type):
+                values = [None if value is None else pd.Timestamp(value) for value in values]
+            frame[column] = pd.Series(values, index=frame.index, dtype=object)
+        elif str(frame[column].dtype) != dtype:
+            # extension dtypes (string, category, nullable ints) come back as numpy/object ones
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def transactions_to_arrow(df: pd.DataFrame, holder: Optional[str] = None) -> pa.Table:
+    """
+    Convert a transaction table to Arrow with explicit types: datetimes stay timestamps, numbers stay
+    numeric, tag (and the holder column, if given) become dictionary arrays and other text becomes strings.
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            columns[str(column)] = series
+        elif column in _CATEGORY_COLUMNS:
+            columns[str(column)] = series.astype("string").astype("category")
+        else:
+            columns[str(column)] = series.astype("string")
+    if holder is not None:
+        columns["holder"] = pd.Series(holder, index=df.index, dtype="string").astype("category")
+    table = pa.Table.from_pandas(pd.DataFrame(columns, index=df.index), preserve_index=False)
+    schema = pa.schema([field.with_type(_DICTIONARY_TYPE) if pa.types.is_dictionary(field.type) else field for field in table.schema])
+    return table.cast(schema)
+
+
+def iter_arrow_table(table: pa.Table, fmt: str) -> Iterator[bytes]:
+    """
+    Encode a table as an Arrow IPC stream or a Parquet file, yielding bytes a record batch / row group at a time.
+    """
+    sink = _ChunkSink()
+    stream = pa.PythonFile(sink, mode="w")
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(stream, table.schema)
+        write = writer.write_batch
+    elif fmt == "parquet":
+        writer = pq.ParquetWriter(stream, table.schema, compression="zstd")
+        write = lambda batch: writer.write_table(pa.Table.from_batches([batch], schema=table.schema))
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    for batch in table.to_batches(max_chunksize=_BATCH_ROWS):
+        write(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+
+def _conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    arrays = [
+        table.column(field.name).cast(field.type) if field.name in table.column_names else pa.nulls(len(table), field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _unified_schema(schemas: List[pa.Schema]) -> pa.Schema:
+    """
+    One schema every holder's table can be cast to, unified a column at a time. Permissive promotion
+    widens e.g. int64/float64 amounts and makes columns missing from some holders nullable; a column
+    whose types don't unify (e.g. string amounts for one holder, doubles for another) becomes string.
+    """
+    fields: Dict[str, List[pa.Field]] = {}
+    for schema in schemas:
+        for field in schema:
+            fields.setdefault(field.name, []).append(field)
+    unified = []
+    for name, candidates in fields.items():
+        try:
+            field = pa.unify_schemas([pa.schema([candidate]) for candidate in candidates], promote_options="permissive").field(name)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            field = pa.field(name, pa.string())
+        unified.append(field.with_nullable(True) if len(candidates) < len(schemas) else field)
+    return pa.schema(unified)
+
+
+def iter_bulk_export(holder_tables: Iterable[Tuple[str, pd.DataFrame]], fmt: str) -> Iterator[bytes]:
+    """
+    Export the transaction tables of many holders as one dataset partitioned by holder.
+    arrow: a single IPC stream with a "holder" column, every holder's table conformed to the unified schema.
+    parquet: a zip of a hive-partitioned dataset, holder=<name>/part-0.parquet, readable with
+    pyarrow.dataset / pandas.read_parquet after extraction.
+    """
+    if fmt == "parquet":
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for name, df in holder_tables:
+                data = b"".join(iter_arrow_table(transactions_to_arrow(df), "parquet"))
+                archive.writestr(f"holder={quote(name, safe='')}/part-0.parquet", data)
+                yield sink.drain()
+        yield sink.drain()
+        return
+    if fmt != "arrow":
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    tables: Dict[str, pa.Table] = {name: transactions_to_arrow(df, holder=name) for name, df in holder_tables}
+    if not tables:
+        return
+    # settled before the first byte, so a conflict between holders can't fail the stream halfway
+    schema = _unified_schema([table.schema for table in tables.values()])
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema) as writer:
+        for table in tables.values():
+            for batch in _conform(table, schema).to_batches(max_chunksize=_BATCH_ROWS):
+                writer.write_batch(batch)
+                yield sink.drain()
+    yield sink.drain()
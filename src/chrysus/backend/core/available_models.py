@@ -1,20 +1,96 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 import os
+import threading
+from typing import Any, Dict, Tuple, TYPE_CHECKING
 from dotenv import load_dotenv
+from chrysus.backend.core.llm_gateway import GatewayModel, get_limiter
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseLanguageModel
 
 load_dotenv()
 
-gemini_2 = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0,
-    api_key=os.getenv("GOOGLE_API_KEY"),
-)
+# registry name -> ChatGoogleGenerativeAI arguments. Clients are built on first use by get_model,
+# so importing the backend needs neither LangChain nor a GOOGLE_API_KEY.
+MODEL_SPECS: Dict[str, Dict[str, Any]] = {
+    "gemini_2": {
+        "model": "gemini-2.0-flash",
+        "temperature": 0,
+    },
+    "gemini_2_5": {
+        "model": "gemini-2.5-flash",
+        "temperature": 0,
+        "thinking_budget": 1024,
+        "include_thoughts": False,
+    },
+}
+
+# registry name -> (requests per minute, tokens per minute) quota the gateway paces each model's calls to
+MODEL_LIMITS: Dict[str, Tuple[float, float]] = {
+    "gemini_2": (
+        float(os.environ.get("GEMINI_2_RPM", "2000")),
+        float(os.environ.get("GEMINI_2_TPM", "4000000")),
+    ),
+    "gemini_2_5": (
+        float(os.environ.get("GEMINI_2_5_RPM", "1000")),
+        float(os.environ.get("GEMINI_2_5_TPM", "1000000")),
+    ),
+}
+
+_models: Dict[str, GatewayModel] = {}
+_models_lock = threading.Lock()
+# how many processes call the models; each paces its calls to an even share of MODEL_LIMITS
+_quota_processes = 1
+
+
+def _quota(name: str) -> Tuple[float, float]:
+    rpm, tpm = MODEL_LIMITS[name]
+    return rpm / _quota_processes, tpm / _quota_processes
+
+
+def share_quota(processes: int) -> None:
+    """
+    Split every model's MODEL_LIMITS evenly across this many processes, since each process has its own
+    limiters. Call it in every process that calls the models; clients already built get their new share.
+    :param processes: (int): The number of processes calling the models, e.g. the ingestion workers plus the API process.
+    """
+    global _quota_processes
+    with _models_lock:
+        _quota_processes = max(1, processes)
+        for name, model in _models.items():
+            model.limiter.set_quota(*_quota(name))
+
+
+def get_model(name: str) -> "BaseLanguageModel":
+    """
+    The shared client for a registered model, built on the first call. It goes through the LLM gateway:
+    calls are paced to this process's share of the model's MODEL_LIMITS (see share_quota) and retried
+    with backoff, see llm_gateway.GatewayModel.
+    :param name: (str): A key of MODEL_SPECS, e.g. "gemini_2_5".
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+    if name not in MODEL_SPECS:
+        raise KeyError(f"Unknown model {name!r}, expected one of {', '.join(MODEL_SPECS)}")
+    with _models_lock:
+        if name not in _models:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            # retries are the gateway's, a single attempt in the client keeps them from compounding
+            client = ChatGoogleGenerativeAI(**MODEL_SPECS[name], api_key=os.getenv("GOOGLE_API_KEY"), max_retries=1)
+            _models[name] = GatewayModel(client, get_limiter(name, *_quota(name)))
+        return _models[name]
+
+
+def model_id(name: str) -> str:
+    """
+    The provider's model id of a registered model, without building its client.
+    """
+    return MODEL_SPECS[name]["model"]
 
-gemini_2_5 = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0,
-    thinking_budget=1024,
-    include_thoughts=False,
-    api_key=os.getenv("GOOGLE_API_KEY"),
-)
 
+def __getattr__(name: str) -> Any:
+    # keeps `available_models.gemini_2_5` working; the client is only built when the attribute is read
+    if name in MODEL_SPECS:
+        return get_model(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from chrysus import resolve_component_dirs_path
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Bump (or set CATEGORY_TAXONOMY_VERSION) whenever the category definitions change; entries written
+# under another version are never served and are purged on start.
+CATEGORY_TAXONOMY_VERSION = os.environ.get("CATEGORY_TAXONOMY_VERSION", "1")
+_CATEGORY_CACHE_MAX_ENTRIES = int(os.environ.get("CATEGORY_CACHE_MAX_ENTRIES", "200000"))
+_SQLITE_MAX_PARAMS = 500
+
+_DATE_PATTERN = re.compile(r"\b\d{1,4}[/.-]\d{1,2}([/.-]\d{1,4})?\b")
+_REFERENCE_PATTERN = re.compile(r"\b(REF|REFERENCE|CONF|CONFIRMATION|TRACE|TRN|TXN|AUTH|ID|INV|ORDER)\s*(NO|NUM)?[#:.\s]*[A-Z0-9-]*\d[A-Z0-9-]*\b")
+_NUMBERED_TOKEN_PATTERN = re.compile(r"[#*]?\b[A-Z]*\d[A-Z0-9]*\b")
+_PUNCTUATION_PATTERN = re.compile(r"[^A-Z&.' ]+")
+
+
+def normalize_description(description: Any) -> str:
+    """
+    Reduce a transaction description to its merchant, so "SHELL OIL 1234 01/02" and
+    "SHELL OIL #5678" share a cache entry. Dates, reference ids, store numbers and any other
+    token containing a digit are dropped, then punctuation and whitespace are collapsed.
+    :return: (str): The normalized key, empty if nothing but numbers was left.
+    """
+    text = str(description or "").upper()
+    text = _DATE_PATTERN.sub(" ", text)
+    text = _REFERENCE_PATTERN.sub(" ", text)
+    text = _NUMBERED_TOKEN_PATTERN.sub(" ", text)
+    text = _PUNCTUATION_PATTERN.sub(" ", text)
+    text = re.sub(r"(?<!\w)[.']+|[.']+(?!\w)", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class CategoryCache:
+    """
+    Persistent normalized-description -> category cache shared by every account holder.
+    Backed by SQLite so it survives restarts and can be shared by worker processes.
+    Least recently used entries are evicted past max_entries.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, max_entries: int = _CATEGORY_CACHE_MAX_ENTRIES, taxonomy_version: str = CATEGORY_TAXONOMY_VERSION):
+        self.db_path = Path(db_path) if db_path is not None else resolve_component_dirs_path("cache") / "categories.sqlite"
+        self.max_entries = max_entries
+        self.taxonomy_version = taxonomy_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS categories (
+                    key TEXT PRIMARY KEY,
+                    category TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    taxonomy_version TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS categories_last_used ON categories (last_used)")
+            purged = self._conn.execute("DELETE FROM categories WHERE taxonomy_version != ?", (taxonomy_version,)).rowcount
+        if purged:
+            logger.info(f"Purged {purged} category cache entries from other taxonomy versions")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up categories for normalized keys.
+        :return: (Dict[str, str]): Category per key, only for the keys that were found.
+        """
+        keys = [key for key in set(keys) if key]
+        found: Dict[str, str] = {}
+        now = time.time()
+        with self._lock, self._conn:
+            for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                chunk = keys[start:start + _SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, category FROM categories WHERE taxonomy_version = ? AND key IN ({placeholders})",
+                    (self.taxonomy_version, *chunk),
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.executemany(
+                    "UPDATE categories SET hits = hits + 1, last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, categories: Dict[str, str], source: str) -> None:
+        """
+        Store categories for normalized keys. source records which step produced them ("bert", "llm").
+        """
+        entries = [(key, str(category), source, self.taxonomy_version, time.time()) for key, category in categories.items() if key]
+        if not entries:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO categories (key, category, source, taxonomy_version, hits, last_used) VALUES (?, ?, ?, ?, 0, ?)",
+                entries,
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM categories WHERE key IN (SELECT key FROM categories ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+
+    def invalidate(self, category: Optional[str] = None, source: Optional[str] = None) -> int:
+        """
+        Drop entries, all of them or only those with the given category and/or source.
+        :return: (int): Number of entries removed.
+        """
+        query, params = "DELETE FROM categories WHERE 1 = 1", []
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category)
+        if source is not None:
+            query += " AND source = ?"
+            params.append(source)
+        with self._lock, self._conn:
+            removed = self._conn.execute(query, params).rowcount
+        logger.info(f"Invalidated {removed} category cache entries")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "taxonomy_version": self.taxonomy_version,
+        }
+
+
+_category_cache: Optional[CategoryCache] = None
+_category_cache_lock = threading.Lock()
+
+
+def get_category_cache() -> CategoryCache:
+    global _category_cache
+    with _category_cache_lock:
+        if _category_cache is None:
+            _category_cache = CategoryCache()
+        return _category_cache
@@ -0,0 +1,185 @@
+import os
+import re
+import time
+import queue
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Optional, Tuple
+from chrysus import resolve_component_dirs_path
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+CLASSIFIER_BACKEND = os.environ.get("CLASSIFIER_BACKEND", "hf").lower()
+# 0 leaves the runtime's default (one thread per core)
+CLASSIFIER_NUM_THREADS = int(os.environ.get("CLASSIFIER_NUM_THREADS", "0"))
+CLASSIFIER_MAX_BATCH = int(os.environ.get("CLASSIFIER_MAX_BATCH", "64"))
+CLASSIFIER_MAX_WAIT_MS = float(os.environ.get("CLASSIFIER_MAX_WAIT_MS", "10"))
+
+
+class ClassifierBackend(ABC):
+    """
+    A text classification runtime that maps a batch of transaction descriptions to labels.
+    """
+
+    @abstractmethod
+    def predict(self, texts: List[str]) -> List[str]:
+        pass
+
+
+class HFPipelineBackend(ClassifierBackend):
+    """
+    The transformers pipeline. fp16 and device_map="auto" are only used when a GPU is present;
+    on CPU the model runs in fp32, which is what CPU kernels are optimized for.
+    """
+
+    def __init__(self, model_name: str, num_threads: int = CLASSIFIER_NUM_THREADS):
+        import torch
+        from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)
+        on_gpu = torch.cuda.is_available()
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name,
+            torch_dtype=torch.float16 if on_gpu else torch.float32,
+            device_map="auto" if on_gpu else None,
+        )
+        self.pipe = pipeline(
+            task="text-classification",
+            model=model,
+            tokenizer=AutoTokenizer.from_pretrained(model_name),
+            truncation=True,
+        )
+
+    def predict(self, texts: List[str]) -> List[str]:
+        raw_preds = self.pipe(texts, batch_size=len(texts))
+        return [p[0]["label"] if isinstance(p, list) else p["label"] for p in raw_preds]
+
+
+class OnnxInt8Backend(ClassifierBackend):
+    """
+    ONNX Runtime with dynamic int8 quantization. The model is exported and quantized once into the
+    models directory and reused on later starts. Requires the `onnx` extra (optimum[onnxruntime]).
+    """
+
+    def __init__(self, model_name: str, num_threads: int = CLASSIFIER_NUM_THREADS, export_dir: Optional[Path] = None):
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from transformers import pipeline, AutoTokenizer
+        except ImportError as e:
+            raise ImportError("The onnx classifier backend requires `pip install chrysus[onnx]`") from e
+
+        self.export_dir = export_dir if export_dir is not None else resolve_component_dirs_path("models") / re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name) / "onnx-int8"
+        if not (self.export_dir / "model_quantized.onnx").exists():
+            self._export_and_quantize(model_name, self.export_dir)
+
+        session_options = onnxruntime.SessionOptions()
+        if num_threads > 0:
+            session_options.intra_op_num_threads = num_threads
+        model = ORTModelForSequenceClassification.from_pretrained(
+            self.export_dir,
+            file_name="model_quantized.onnx",
+            session_options=session_options,
+            provider="CPUExecutionProvider",
+        )
+        self.pipe = pipeline(
+            task="text-classification",
+            model=model,
+            tokenizer=AutoTokenizer.from_pretrained(self.export_dir),
+            truncation=True,
+        )
+
+    @staticmethod
+    def _export_and_quantize(model_name: str, export_dir: Path) -> None:
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        logger.info(f"Exporting {model_name} to ONNX with int8 dynamic quantization in {export_dir}")
+        fp32_dir = export_dir.parent / "onnx-fp32"
+        ORTModelForSequenceClassification.from_pretrained(model_name, export=True).save_pretrained(fp32_dir)
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir)
+        quantizer.quantize(
+            save_dir=export_dir,
+            quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False),
+        )
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+    def predict(self, texts: List[str]) -> List[str]:
+        raw_preds = self.pipe(texts, batch_size=len(texts))
+        return [p[0]["label"] if isinstance(p, list) else p["label"] for p in raw_preds]
+
+
+def build_classifier_backend(model_name: str, backend: str = CLASSIFIER_BACKEND, num_threads: int = CLASSIFIER_NUM_THREADS) -> ClassifierBackend:
+    if backend == "onnx":
+        return OnnxInt8Backend(model_name, num_threads=num_threads)
+    if backend == "hf":
+        return HFPipelineBackend(model_name, num_threads=num_threads)
+    raise ValueError(f"Unknown classifier backend: {backend}")
+
+
+class DynamicBatcher:
+    """
+    Serves classification requests from many threads through one backend.
+    Requests arriving within max_wait_ms of each other are merged, their texts are sorted by length
+    and cut into batches of at most max_batch, so similarly sized descriptions are padded together
+    and concurrently ingesting tables share batches instead of each running their own.
+    """
+
+    def __init__(self, backend: ClassifierBackend, max_batch: int = CLASSIFIER_MAX_BATCH, max_wait_ms: float = CLASSIFIER_MAX_WAIT_MS):
+        self.backend = backend
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._requests: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="classifier-batcher", daemon=True)
+        self._thread.start()
+
+    def classify(self, texts: List[str]) -> List[str]:
+        """
+        Classify texts, blocking until the labels are ready.
+        """
+        if not texts:
+            return []
+        future: Future = Future()
+        self._requests.put((list(texts), future))
+        return future.result()
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        pending = [self._requests.get()]
+        queued_texts = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while queued_texts < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(request)
+            queued_texts += len(request[0])
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            entries = [(i, j, text) for i, (texts, _) in enumerate(pending) for j, text in enumerate(texts)]
+            entries.sort(key=lambda entry: len(entry[2]))
+            labels = [[None] * len(texts) for texts, _ in pending]
+            try:
+                for start in range(0, len(entries), self.max_batch):
+                    batch = entries[start:start + self.max_batch]
+                    for (i, j, _), label in zip(batch, self.backend.predict([text for _, _, text in batch])):
+                        labels[i][j] = label
+            except Exception as e:
+                logger.error(f"Classifier batch failed: {e}")
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            for (_, future), request_labels in zip(pending, labels):
+                future.set_result(request_labels)
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from chrysus import resolve_component_dirs_path
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Bump when the shape of what extractors return changes so stale entries are never served.
+EXTRACTION_CACHE_VERSION = 1
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_content_digest(pdf_path: Union[Path, str]) -> str:
+    """
+    Compute the sha256 hex digest of a file's contents.
+    :param pdf_path: (Path | str): The file to hash.
+    :return: (str): The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent on-disk cache of extractor results keyed by the PDF's content hash plus the
+    extractor/model configuration. Each entry is a single JSON file so a hit is one small read.
+    Eviction is by age and by total size / entry count, oldest access first.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_entries: int = int(os.environ.get("EXTRACTION_CACHE_MAX_ENTRIES", "2000")),
+        max_bytes: int = int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+        max_age_seconds: float = float(os.environ.get("EXTRACTION_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else resolve_component_dirs_path("cache") / "extractions"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(content_digest: str, config: Dict[str, Any]) -> str:
+        """
+        Build the cache key from the file digest and the extractor configuration.
+        :param content_digest: (str): sha256 of the PDF contents.
+        :param config: (Dict[str, Any]): JSON serializable description of the extractor/model setup.
+        :return: (str): The cache key.
+        """
+        config_blob = json.dumps({"version": EXTRACTION_CACHE_VERSION, **config}, sort_keys=True, default=str)
+        config_digest = hashlib.sha256(config_blob.encode("utf-8")).hexdigest()[:16]
+        return f"{content_digest}-{config_digest}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the cached extraction for the key, or None on a miss or an expired entry.
+        """
+        path = self._entry_path(key)
+        try:
+            stat = path.stat()
+            if self.max_age_seconds > 0 and time.time() - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                raise FileNotFoundError(path)
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            # touch so eviction is by last access rather than by write time
+            os.utime(path, None)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry.get("tables")
+
+    def put(self, key: str, tables: List[Dict[str, Any]]) -> None:
+        """
+        Store an extraction result. Writes go through a temp file and an atomic rename so readers
+        never see a partial entry.
+        """
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created_at": time.time(), "tables": tables}, f, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to write extraction cache entry {key}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then the least recently used ones until the cache is within its
+        entry and byte limits.
+        :return: (int): Number of entries removed.
+        """
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        removed = 0
+        total_bytes = sum(size for _, size, _ in entries)
+        remaining = len(entries)
+        for mtime, size, path in entries:
+            expired = self.max_age_seconds > 0 and now - mtime > self.max_age_seconds
+            over_limit = remaining > self.max_entries or total_bytes > self.max_bytes
+            if not expired and not over_limit:
+                break
+            path.unlink(missing_ok=True)
+            removed += 1
+            remaining -= 1
+            total_bytes -= size
+        if removed:
+            logger.info(f"Evicted {removed} extraction cache entries")
+        return removed
+
+    def clear(self) -> None:
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": sum(1 for _ in self.cache_dir.glob("*.json")),
+        }
@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+import pyarrow.parquet as pq
+from chrysus import resolve_component_dirs_path
+from chrysus.backend.core.account_holder import AccountHolder
+from chrysus.backend.core.informed_table import InformedTable
+from chrysus.backend.core.arrow_export import frame_to_arrow, arrow_to_frame
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+_SET_MARKER = "__set__"
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (set, frozenset)):
+        return {_SET_MARKER: sorted(obj, key=str)}
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if hasattr(obj, "item"):
+        # numpy scalars
+        return obj.item()
+    return str(obj)
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if obj.keys() == {_SET_MARKER}:
+        return set(obj[_SET_MARKER])
+    return obj
+
+
+def _encode(obj: Any) -> str:
+    return json.dumps(obj, default=_json_default)
+
+
+def _decode(text: Optional[str]) -> Any:
+    return json.loads(text, object_hook=_json_object_hook) if text else None
+
+
+def _holder_dir_name(name: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", name).strip("-")[:48] or "holder"
+    return f"{slug}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:10]}"
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    pq.write_table(frame_to_arrow(df), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def _read_parquet(path: Path) -> pd.DataFrame:
+    return arrow_to_frame(pq.read_table(path, memory_map=True))
+
+
+class HolderStorage:
+    """
+    Durable account holder state: every table is a Parquet file under data/holders/<holder>/ and
+    everything else (names, account ids, user_information, pdf paths, transformation history,
+    insights, the account number -> name identifiers) lives in a SQLite file next to them.
+    Holders are restored as lazy stubs whose tables are read, memory-mapped, on first access.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else resolve_component_dirs_path("data") / "holders"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.root / "holders.sqlite", check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS holders (
+                    name TEXT PRIMARY KEY,
+                    account_ids TEXT NOT NULL,
+                    data_version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS holder_tables (
+                    holder TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    user_information TEXT,
+                    pdf_path TEXT,
+                    transformation_history TEXT,
+                    insights TEXT,
+                    PRIMARY KEY (holder, kind, position)
+                );
+                CREATE TABLE IF NOT EXISTS identifiers (
+                    account_number TEXT PRIMARY KEY,
+                    name TEXT NOT NULL
+                );
+                """
+            )
+
+    def save_holder(self, holder: AccountHolder) -> None:
+        """
+        Persist a holder's current snapshot. Callers hold holder.lock so saves of one holder don't interleave.
+        The transaction table is rewritten under a new file per data version,
+        descriptive tables never change once added so only new ones are written.
+        """
+        holder_dir = self.root / _holder_dir_name(holder.name)
+        holder_dir.mkdir(exist_ok=True)
+        snapshot = holder.snapshot()
+        version = snapshot.data_version
+        rows: List[Tuple[Any, ...]] = []
+        transaction_path = None
+        if snapshot.transaction_table is not None:
+            transaction_path = holder_dir / f"transactions-v{version}.parquet"
+            _write_parquet(snapshot.transaction_table.table, transaction_path)
+            rows.append(self._table_row(holder.name, "transaction", 0, transaction_path, snapshot.transaction_table))
+        for position, table in enumerate(snapshot.descriptive_tables):
+            path = holder_dir / f"descriptive-{position}.parquet"
+            if not path.exists():
+                _write_parquet(table.table, path)
+            rows.append(self._table_row(holder.name, "descriptive", position, path, table))
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO holders (name, account_ids, data_version, updated_at) VALUES (?, ?, ?, ?)",
+                (holder.name, _encode(holder.account_ids), version, time.time()),
+            )
+            self._conn.execute("DELETE FROM holder_tables WHERE holder = ?", (holder.name,))
+            self._conn.executemany(
+                "INSERT INTO holder_tables (holder, kind, position, path, user_information, pdf_path, transformation_history, insights) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        # only drop superseded transaction files once the metadata points at the new one
+        for old_path in holder_dir.glob("transactions-v*.parquet"):
+            if old_path != transaction_path:
+                old_path.unlink(missing_ok=True)
+        logger.info(f"Saved holder {holder.name} at version {version} ({len(rows)} tables)")
+
+    def _table_row(self, holder: str, kind: str, position: int, path: Path, table: InformedTable) -> Tuple[Any, ...]:
+        return (
+            holder,
+            kind,
+            position,
+            str(path.relative_to(self.root)),
+            _encode(table.user_information),
+            _encode(table.pdf_path),
+            _encode(table.transformation_history),
+            _encode(table.insights),
+        )
+
+    def holds_pdf(self, holder: str, pdf_path: str) -> bool:
+        """
+        Whether a stored table of the holder was built from pdf_path and its Parquet file is still there, without reading any table.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT path, pdf_path FROM holder_tables WHERE holder = ?", (holder,)).fetchall()
+        return any(str(pdf_path) in (_decode(paths) or set()) and (self.root / path).exists() for path, paths in rows)
+
+    def save_identifiers(self, identifiers: Dict[str, str]) -> None:
+        entries = [(str(account_number), name) for account_number, name in identifiers.items() if account_number is not None]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO identifiers (account_number, name) VALUES (?, ?)", entries)
+
+    def load_all(self) -> Tuple[Dict[str, AccountHolder], Dict[str, str]]:
+        """
+        Restore every holder as a stub with its name, account ids and data version. No table is read
+        until the holder's tables are first accessed.
+        :return: (Tuple[Dict[str, AccountHolder], Dict[str, str]]): The account holder map and identifiers.
+        """
+        with self._lock:
+            holder_rows = self._conn.execute("SELECT name, account_ids, data_version FROM holders").fetchall()
+            identifiers = dict(self._conn.execute("SELECT account_number, name FROM identifiers").fetchall())
+        holders: Dict[str, AccountHolder] = {}
+        for name, account_ids, data_version in holder_rows:
+            holder = AccountHolder(name=name, account_ids=_decode(account_ids) or set())
+            holder.data_version = data_version
+            holder._loader = self._load_tables
+            holders[name] = holder
+        logger.info(f"Restored {len(holders)} account holders from {self.root}")
+        return holders, identifiers
+
+    def _load_tables(self, holder: AccountHolder) -> None:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, path, user_information, pdf_path, transformation_history, insights FROM holder_tables "
+                "WHERE holder = ? ORDER BY kind, position",
+                (holder.name,),
+            ).fetchall()
+        start = time.perf_counter()
+        transaction_table = None
+        descriptive_tables = []
+        for kind, path, user_information, pdf_path, transformation_history, insights in rows:
+            table = InformedTable.restore(
+                _read_parquet(self.root / path),
+                user_information=_decode(user_information) or {},
+                pdf_path=_decode(pdf_path) or set(),
+                transformation_history=_decode(transformation_history) or [],
+                insights=_decode(insights) or {},
+                is_transaction_table=kind == "transaction",
+            )
+            if kind == "transaction":
+                transaction_table = table
+            else:
+                descriptive_tables.append(table)
+        holder.restore(transaction_table, descriptive_tables)
+        logger.info(f"Loaded {len(rows)} tables of {holder.name} in {time.perf_counter() - start:.3f}s")
@@ -1,17 +1,26 @@
+import os
 import copy
 import re
 import json
 import numpy as np
+from datetime import datetime
+from functools import lru_cache
 from dateutil import parser
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-import torch
-from typing import List, Dict, Any, Optional, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Union, Tuple, TYPE_CHECKING
 import pandas as pd
 from pathlib import Path
-from langchain_core.language_models import BaseLanguageModel
-from chrysus.backend.core.available_models import gemini_2, gemini_2_5
+from chrysus.backend.core.available_models import get_model
+from chrysus.backend.core.transaction_store import TransactionStore
+from chrysus.backend.core.transaction_features import TransactionFeatureEngine
+from chrysus.backend.core.classifier_backend import DynamicBatcher, build_classifier_backend
+from chrysus.backend.core.category_cache import get_category_cache, normalize_description
 from chrysus.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseLanguageModel
+
 
 logger = get_logger(__name__)
 
@@ -20,50 +29,116 @@ _MODEL_NAME = (
     "wanadzhar913/debertav3-finetuned-banking-transaction-classification-text-only"
 )
 _UNCATEGORIZED = {"uncategorized", "other", "", None}
+# dedup key for descriptions that normalize to nothing; never a valid normalized key, so never cached
+_RAW_KEY_PREFIX = "raw:"
+_LLM_CATEGORIZATION_BATCH_SIZE = int(os.environ.get("LLM_CATEGORIZATION_BATCH_SIZE", "40"))
+_LLM_CATEGORIZATION_WORKERS = int(os.environ.get("LLM_CATEGORIZATION_WORKERS", "4"))
+_LLM_CATEGORIZATION_ATTEMPTS = int(os.environ.get("LLM_CATEGORIZATION_ATTEMPTS", "3"))
+
+
+# Candidate formats for the dominant-format probe, in order of preference when several parse the
+# same number of values (month-first before day-first, matching dateutil's default).
+_DATE_FORMATS = [
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y/%m/%d",
+    "%m/%d/%Y", "%m/%d/%y", "%m-%d-%Y", "%m-%d-%y", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y",
+    "%b %d, %Y", "%B %d, %Y", "%b %d %Y", "%B %d %Y", "%d %b %Y", "%d %B %Y", "%d-%b-%Y", "%d-%b-%y",
+    "%b %d", "%B %d", "%d %b", "%d %B", "%m/%d", "%m-%d",
+]
+_FORMAT_PROBE_SIZE = 200
+# two leap years so "Feb 29" survives, and parsing with both tells us whether the string had a year
+_DEFAULT_A = datetime(2000, 1, 1)
+_DEFAULT_B = datetime(2004, 1, 1)
+
+
+def _has_year(fmt: str) -> bool:
+    return "%Y" in fmt or "%y" in fmt
+
+
+def _detect_date_format(values: pd.Index) -> Optional[str]:
+    """
+    Find the explicit format that parses the most values of a sample, or None if none parse.
+    """
+    sample = values[:_FORMAT_PROBE_SIZE]
+    best_fmt, best_count = None, 0
+    for fmt in _DATE_FORMATS:
+        count = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if count > best_count:
+            best_fmt, best_count = fmt, count
+    return best_fmt
+
+
+@lru_cache(maxsize=65536)
+def _parse_date_string(date_str: str) -> Tuple[Optional[pd.Timestamp], bool]:
+    """
+    Fuzzy-parse a single date string, memoized across calls.
+    :return: (Tuple[Timestamp | None, bool]): The parsed date and whether the string carried its own year.
+    """
+    try:
+        dt = parser.parse(date_str, fuzzy=True, default=_DEFAULT_A)
+        has_year = parser.parse(date_str, fuzzy=True, default=_DEFAULT_B).year == dt.year
+    except Exception:
+        return None, False
+    return pd.Timestamp(dt.replace(tzinfo=None)), has_year
+
+
+def _parse_unique_dates(values: pd.Index) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Parse each distinct date string once: the dominant explicit format in one vectorized pass, then
+    the memoized fuzzy parser for whatever that format didn't cover.
+    """
+    fmt = _detect_date_format(values)
+    if fmt is not None:
+        parsed = pd.Series(pd.to_datetime(values, format=fmt, errors="coerce"))
+        has_year = np.full(len(values), _has_year(fmt))
+    else:
+        parsed = pd.Series(pd.NaT, index=range(len(values)), dtype="datetime64[ns]")
+        has_year = np.zeros(len(values), dtype=bool)
+    for i in np.flatnonzero(parsed.isna().to_numpy()):
+        dt, year_present = _parse_date_string(values[i])
+        if dt is not None:
+            parsed.iat[i] = dt
+            has_year[i] = year_present
+    return parsed, has_year
 
 
 def infer_and_fix_dates(df: pd.DataFrame, date_col: str = "date") -> pd.Series:
     """
     Normalize date strings to full datetime objects.
-    Handles varying formats, including partial dates (like 'Feb 2').
-    Infers missing years from context (by walking down the column).
+    Handles varying formats, including partial dates (like 'Feb 2'), which take the current year
+    as dateutil's default does. Rows that can't be parsed inherit the previous row's date.
+    Distinct strings are parsed once, with the column's dominant format detected up front and
+    applied in a single pd.to_datetime call; gap filling is a forward fill.
     Args:
         df: DataFrame with a date column (possibly messy).
         date_col: Name of the column to fix.
     Returns:
-        pd.Series of datetime objects (np.nan if could not be parsed).
+        pd.Series of datetime objects (NaT if could not be parsed).
     """
-    fixed_dates = []
-    last_full_date = None
-    inferred_year = None
-    for i, raw_date in enumerate(df[date_col]):
-        date_str = str(raw_date).strip()
-        dt = None
-
-        try:
-            dt = parser.parse(date_str, fuzzy=True, default=None)
-            if dt.year == 1900 and inferred_year:
-                dt = dt.replace(year=inferred_year)
-        except Exception:
-            dt = None
-
-        if dt is None:
-            m = re.match(r"([A-Za-z]+)\s+(\d{1,2})", date_str)
-            if m and last_full_date is not None:
-                month_name, day = m.groups()
-                try:
-                    dt = parser.parse(f"{month_name} {day} {last_full_date.year}")
-                except Exception:
-                    dt = None
-            elif last_full_date is not None:
-                dt = last_full_date
-
-        if dt is not None:
-            last_full_date = dt
-            inferred_year = dt.year
-        fixed_dates.append(dt)
+    if pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        return df[date_col]
+    strings = df[date_col].astype(str).str.strip()
+    codes, uniques = pd.factorize(strings)
+    unique_dates, unique_has_year = _parse_unique_dates(pd.Index(uniques))
+
+    dates = pd.Series(unique_dates.to_numpy()[codes], index=df.index)
+    has_year = unique_has_year[codes]
+    parsed = dates.notna().to_numpy()
+
+    # partial dates take the current year, not one inferred from the rows above: a statement's year
+    # boundary (Dec 30 then Jan 2) can't be told apart from rows out of order
+    partial = parsed & ~has_year
+    if partial.any():
+        dates[partial] = pd.to_datetime(
+            pd.DataFrame({
+                "year": datetime.now().year,
+                "month": dates[partial].dt.month,
+                "day": dates[partial].dt.day,
+            }),
+            errors="coerce",
+        )
 
-    return pd.Series(fixed_dates, index=df.index)
+    # rows that could not be parsed at all inherit the previous row's date
+    return dates.ffill()
 
 
 def user_information_union(left: dict, right: dict) -> dict:
@@ -87,16 +162,23 @@ def user_information_union(left: dict, right: dict) -> dict:
 
 class InformedTable:
 
-    _classifier_pipe: Optional[pipeline] = None
+    _classifier: Optional[DynamicBatcher] = None
+    _classifier_lock = threading.Lock()
 
-    def __init__(self, table: Union[List[List[Any]], pd.DataFrame], user_information: Dict[str, Any], pdf_path: Union[Path, str], resolver_llm: BaseLanguageModel = gemini_2_5):
+    def __init__(self, table: Union[List[List[Any]], pd.DataFrame], user_information: Dict[str, Any], pdf_path: Union[Path, str], resolver_llm: Optional["BaseLanguageModel"] = None, preprocess: bool = True):
+        """
+        :param resolver_llm: (BaseLanguageModel | None): Categorizes what the classifier leaves uncategorized, the registry's gemini_2_5 when None.
+        :param preprocess: (bool): Run date fixing and classification on the table. False for tables restored from storage, which were preprocessed when first ingested.
+        """
 
         self.user_information = user_information
         self.insights = {}
         self.transformation_history = []
         self.pdf_path = {str(pdf_path)}
         self.is_transaction_table = False
-        self.resolver_llm = resolver_llm
+        self._resolver_llm = resolver_llm
+        self._store: Optional[TransactionStore] = None
+        self._features: Optional[TransactionFeatureEngine] = None
         if isinstance(table, pd.DataFrame):
             self.table = table
         else:
@@ -104,25 +186,43 @@ class InformedTable:
                 table[0][i] = table[0][i].lower()
             self.table = pd.DataFrame(table[1:], columns=table[0])
         self.table.columns = self.table.columns.str.lower()
-        self._pre_process_insights()
+        if preprocess:
+            self._pre_process_insights()
+
+    @property
+    def resolver_llm(self) -> "BaseLanguageModel":
+        return self._resolver_llm if self._resolver_llm is not None else get_model("gemini_2_5")
 
     @classmethod
-    def _get_classifier(cls) -> "pipeline":
-        """Lazily instantiate the DeBERTa-V3-large classifier in fp16."""
-        if cls._classifier_pipe is None:
-            cls._classifier_pipe = pipeline(
-                task="text-classification",
-                model=AutoModelForSequenceClassification.from_pretrained(
-                    _MODEL_NAME,
-                    torch_dtype=torch.float16,      
-                    device_map="auto",
-                    load_in_8bit=False,             
-                ),
-                tokenizer=AutoTokenizer.from_pretrained(_MODEL_NAME),
-                batch_size=64,
-                truncation=True,
-            )
-        return cls._classifier_pipe
+    def restore(
+        cls,
+        table: pd.DataFrame,
+        user_information: Dict[str, Any],
+        pdf_path: Set[str],
+        transformation_history: List[Dict[str, Any]],
+        insights: Dict[str, Any],
+        is_transaction_table: bool,
+    ) -> "InformedTable":
+        """
+        Rebuild an already preprocessed table from its parts (from storage or a worker process) without preprocessing it again.
+        """
+        restored = cls(table, user_information, "", preprocess=False)
+        restored.pdf_path = set(pdf_path)
+        restored.transformation_history = transformation_history
+        restored.insights = insights
+        restored.is_transaction_table = is_transaction_table
+        return restored
+
+    @classmethod
+    def _get_classifier(cls) -> DynamicBatcher:
+        """
+        Lazily instantiate the DeBERTa-V3 classifier on the configured backend (CLASSIFIER_BACKEND),
+        behind a dynamic batcher shared by every table in the process.
+        """
+        with cls._classifier_lock:
+            if cls._classifier is None:
+                cls._classifier = DynamicBatcher(build_classifier_backend(_MODEL_NAME))
+        return cls._classifier
     
     def _classify_transactions(self) -> None:
         logger.info("Classifying transactions")
@@ -134,72 +234,144 @@ class InformedTable:
             return
 
         unc_df = self.table.loc[mask].reset_index()
-        payload = json.dumps(unc_df.to_dict(orient="records"), ensure_ascii=False)
+        keys = unc_df["description"].map(normalize_description)
+        category_cache = get_category_cache()
+        cached = category_cache.get_many(keys)
+        hit = keys.isin(list(cached)).to_numpy()
+        if hit.any():
+            self.table.loc[unc_df.loc[hit, "index"], "txn_category"] = keys[hit].map(cached).values
+        # only one row per unseen merchant goes to the LLM; descriptions with no merchant text left stay distinct
+        dedup_keys = keys.where(keys.ne(""), _RAW_KEY_PREFIX + unc_df["description"].astype(str))
+        miss_df, miss_keys = unc_df.loc[~hit], dedup_keys[~hit]
+        unc_df = miss_df.loc[~miss_keys.duplicated()]
+        if unc_df.empty:
+            return
+        descriptions = unc_df["description"].fillna("").astype(str).tolist()
+        categories = self._categorize_descriptions_via_llm(descriptions)
+        failed = sum(1 for category in categories if category is None)
+        categories = [category if category is not None else "uncategorized" for category in categories]
+
+        category_by_key = dict(zip(miss_keys[unc_df.index], categories))
+        self.table.loc[miss_df["index"], "txn_category"] = miss_keys.map(category_by_key).values
+        category_cache.put_many(
+            {k: v for k, v in category_by_key.items() if not k.startswith(_RAW_KEY_PREFIX) and v.lower() not in _UNCATEGORIZED},
+            source="llm",
+        )
+        self.transformation_history.append(
+            {
+                "step": "llm_uncategorized_fix",
+                "model": getattr(self.resolver_llm, "wrapped", self.resolver_llm).__class__.__name__,
+                "rows": int(mask.sum()),
+                "cache_hits": int(hit.sum()),
+                "llm_rows": len(unc_df),
+                "failed_rows": failed,
+            }
+        )
 
-        prompt = f"""
+    def _build_categorization_prompt(self, batch: List[Dict[str, Any]]) -> str:
+        payload = json.dumps(batch, ensure_ascii=False)
+        return f"""
 <task>
-You are given a table of uncategorized bank-transaction rows (JSON records).
-Return the SAME table, in the SAME order, as a JSON list-of-lists where the
-first row is the headers; only difference: supply a meaningful value in each
-row's "txn_category" cell. The txn_category column should be a generalized category
+You are given uncategorized bank-transaction descriptions as JSON records with an id "i".
+For every record return its "i" and a meaningful "txn_category". The txn_category should be a generalized category
 of a transaction. For example, "food", "leisure", "utilities", "salary", "rent", "transport", "health", etc.
 Some transactions are much more important to correctly categorize, like any loans, mortgages, credit card payments, and ANY debt.
 Never give a category that is too specific Ex: Gym membership or Bank fees should be "health" or "utilities" 
-Only respond with row values that can be parsed via json.loads inside of the <json_table> tag.
+Return one record per input record. Only respond with JSON that can be parsed via json.loads inside of the <json_categories> tag.
 No commentary. You MUST respond strictly within the provided XML tags. If you do not, the caller will not be able to parse your response.
-We require the "<json_table>" tag to be present in your response.
+We require the "<json_categories>" tag to be present in your response.
 </task>
 <input>
 {payload}
 </input>
 <output>
-<json_table>
-{{"table":[["index","date","description","transaction_amount","balance","txn_category"], ...]}}
-</json_table>
+<json_categories>
+[{{"i": 0, "txn_category": "..."}}, ...]
+</json_categories>
 </output>
 """.strip()
 
+    def _categorize_batch_via_llm(self, batch: List[Dict[str, Any]]) -> Dict[int, str]:
+        """
+        Categorize one batch. Returns the categories that came back for ids of this batch;
+        ids that are missing or malformed in the reply are simply absent.
+        """
+        requested = {row["i"] for row in batch}
         try:
-            resp = self.resolver_llm.invoke(prompt)
-            match = re.search(r"<json_table>(.*?)</json_table>", resp.content, re.DOTALL)
+            resp = self.resolver_llm.invoke(self._build_categorization_prompt(batch))
+            match = re.search(r"<json_categories>(.*?)</json_categories>", resp.content, re.DOTALL)
             if not match:
-                raise ValueError("No <json_table> tags in LLM reply")
-            table_json = json.loads(match.group(1))
-            tbl = table_json.get("table")
-            if not tbl or len(tbl) - 1 != len(unc_df):
-                raise ValueError("Row-count mismatch between request and LLM reply")
-            fixed_df = pd.DataFrame(tbl[1:], columns=tbl[0])
-            if not unc_df['description'].tolist() == fixed_df['description'].tolist():
-                raise ValueError("Row-order/content mismatch between request and LLM reply")
-            self.table.loc[unc_df["index"], "txn_category"] = fixed_df["txn_category"].astype(str).values
-            self.transformation_history.append(
-                {
-                    "step": "llm_uncategorized_fix",
-                    "model": self.resolver_llm.__class__.__name__,
-                    "rows": int(mask.sum()),
-                }
-            )
+                raise ValueError("No <json_categories> tags in LLM reply")
+            records = json.loads(match.group(1))
         except Exception as e:
-            print(f"LLM table classification error: {e}")
-            print(f"LLM response: {getattr(resp, 'content', None)}")
-            raise
+            logger.warning(f"LLM categorization of a {len(batch)} row batch failed: {e}")
+            return {}
+        categories = {}
+        for record in records if isinstance(records, list) else []:
+            if not isinstance(record, dict):
+                continue
+            i, category = record.get("i"), record.get("txn_category")
+            if isinstance(i, str) and i.isdigit():
+                i = int(i)
+            if i in requested and isinstance(category, str) and category.strip():
+                categories[i] = category.strip()
+        return categories
+
+    def _categorize_descriptions_via_llm(self, descriptions: List[str]) -> List[Optional[str]]:
+        """
+        Categorize descriptions in fixed-size batches run concurrently. Each batch is validated on
+        its own; only the rows that did not come back are retried, and rows that still fail after
+        the last attempt are returned as None instead of aborting the table.
+        """
+        categories: List[Optional[str]] = [None] * len(descriptions)
+        pending = list(range(len(descriptions)))
+        for attempt in range(_LLM_CATEGORIZATION_ATTEMPTS):
+            if not pending:
+                break
+            batches = [
+                [{"i": i, "description": descriptions[i]} for i in pending[start:start + _LLM_CATEGORIZATION_BATCH_SIZE]]
+                for start in range(0, len(pending), _LLM_CATEGORIZATION_BATCH_SIZE)
+            ]
+            with ThreadPoolExecutor(max_workers=min(_LLM_CATEGORIZATION_WORKERS, len(batches))) as executor:
+                for batch_categories in executor.map(self._categorize_batch_via_llm, batches):
+                    for i, category in batch_categories.items():
+                        categories[i] = category
+            pending = [i for i in pending if categories[i] is None]
+            if pending:
+                logger.warning(f"{len(pending)} rows not categorized after attempt {attempt + 1}/{_LLM_CATEGORIZATION_ATTEMPTS}")
+        if pending:
+            logger.error(f"Giving up on LLM categorization for {len(pending)} rows, leaving them uncategorized")
+        return categories
  
     def _classify_transactions_via_tuned_bert(self):
         self.is_transaction_table = True
         classifier = self._get_classifier()
 
         narratives = self.table["description"].fillna("").astype(str).tolist()
-        raw_preds = classifier(narratives)
-        labels = [
-            p[0]["label"] if isinstance(p, list) else p["label"]
-            for p in raw_preds
+        keys = [normalize_description(narrative) for narrative in narratives]
+        category_cache = get_category_cache()
+        cached = category_cache.get_many(keys)
+        # one representative description per unseen merchant goes through the model
+        misses: Dict[str, str] = {}
+        for key, narrative in zip(keys, narratives):
+            if key not in cached:
+                misses.setdefault(key or _RAW_KEY_PREFIX + narrative, narrative)
+        predicted = dict(zip(misses, classifier.classify(list(misses.values()))))
+        self.table["txn_category"] = [
+            cached[key] if key in cached else predicted[key or _RAW_KEY_PREFIX + narrative]
+            for key, narrative in zip(keys, narratives)
         ]
-        self.table["txn_category"] = labels
+        category_cache.put_many(
+            {k: v for k, v in predicted.items() if not k.startswith(_RAW_KEY_PREFIX) and str(v).lower() not in _UNCATEGORIZED},
+            source="bert",
+        )
         self.transformation_history.append(
             {
                 "step": "txn_classification",
                 "model": _MODEL_NAME,
                 "rows": len(self.table),
+                "cache_hits": len(narratives) - sum(1 for key in keys if key not in cached),
+                "model_rows": len(misses),
             }
         ) 
 
@@ -287,63 +459,95 @@ We require the "<json_table>" tag to be present in your response.
             table= unified_df,
             user_information=user_information,
             pdf_path=pdf_paths,
-            resolver_llm=table1.resolver_llm
+            resolver_llm=table1._resolver_llm
         )
         new_informed_table.insights = insights
         new_informed_table.is_transaction_table = True
         logger.info(f"Unifying tables was a success")
         return new_informed_table
 
+    def index_transactions(self) -> None:
+        """
+        Build the row store and then the feature aggregates from the store's (deduplicated) table,
+        so the aggregates always describe exactly the rows in self.table. Modifies the table, so only
+        for writers, before the table is shared with readers.
+        """
+        if self._store is None:
+            self._store = TransactionStore(self.table)
+            if len(self._store) != len(self.table):
+                # aggregates built before the store dropped duplicate rows would count them
+                self._features = None
+            self.table = self._store.table
+        if self._features is None:
+            self._features = TransactionFeatureEngine.from_table(self.table)
+            self.insights = {"transaction_features": self._features.features()}
+
+    def copy_for_append(self) -> "InformedTable":
+        """
+        A copy to append into while readers keep using this table: it gets its own row store, feature
+        aggregates, history and insights, and shares only the DataFrame, which appends replace.
+        """
+        copied = copy.copy(self)
+        copied.transformation_history = list(self.transformation_history)
+        copied.insights = dict(self.insights)
+        copied.pdf_path = set(self.pdf_path)
+        copied._store = self._store.copy() if self._store is not None else None
+        copied._features = self._features.copy() if self._features is not None else None
+        return copied
+
+    def append_transactions(self, other: "InformedTable") -> int:
+        """
+        Merges another transaction table into this one in place (see copy_for_append for a table readers may hold):
+        - Rows already present (by row fingerprint) are skipped, new rows are merged in date order.
+        - pdf_path and user_information are unioned as in unify_tables.
+        - Transaction features are updated with the added rows only.
+        Dedup and ordering cost time proportional to the new table; the merged table itself is one
+        linear copy of the history, instead of re-deduplicating and re-sorting it.
+        Returns the number of rows added.
+        """
+        if not self.is_transaction_table or not other.is_transaction_table:
+            raise ValueError("Cannot unify tables when neither is a transaction table.")
+        self.index_transactions()
+        added = self._store.append(other.table)
+        self.table = self._store.table
+        self.pdf_path = self.pdf_path | other.pdf_path
+        self.user_information = user_information_union(self.user_information, other.user_information)
+        self._features.update(added)
+        self.insights = {"transaction_features": self._features.features()}
+        self.transformation_history.append(
+            {
+                "step": "append_transactions",
+                "rows_added": len(added),
+                "rows": len(self.table),
+            }
+        )
+        logger.info(f"Appended {len(added)} new rows ({len(other.table) - len(added)} duplicates skipped)")
+        return len(added)
+
     def extract_transaction_features(self):
         if not self.is_transaction_table:
             logger.info("Feature extraction only valid for transaction tables.")
             return
 
-        df = self.table.copy()
-        features = {}
-
-        if not pd.api.types.is_datetime64_any_dtype(df["date"]):
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-        desc_counts = df["description"].value_counts()
-        frequent_descs = desc_counts[desc_counts > 3].index.tolist()
-        desc_grouped = (
-            df[df["description"].isin(frequent_descs)]
-            .groupby("description")["transaction_amount"]
-            .agg(["mean", "max", "min", "sum", "std", "count"])
-            .reset_index()
-        )
-        features["frequent_descriptions"] = desc_grouped.to_dict(orient="records")
-
-        tag_grouped = (
-            df.groupby("tag")["transaction_amount"]
-            .agg(["mean", "max", "min", "sum", "std", "count"])
-            .reset_index()
-        )
-        features["tags"] = tag_grouped.to_dict(orient="records")
-
-        df["month"] = df["date"].dt.to_period("M")
-        monthly_grouped = (
-            df.groupby("month")["transaction_amount"]
-            .agg(["mean", "max", "min", "sum", "std", "count"])
-            .reset_index()
-        )
-
-        monthly_grouped["month"] = monthly_grouped["month"].astype(str)
-        features["monthly"] = monthly_grouped.to_dict(orient="records")
+        if self._features is None:
+            self._features = TransactionFeatureEngine.from_table(self.table)
+        features = self._features.features()
 
-        df["week"] = df["date"].dt.to_period("W")
-        weekly_grouped = (
-            df.groupby("week")["transaction_amount"]
-            .agg(["mean", "max", "min", "sum", "std", "count"])
-            .reset_index()
-        )
-        weekly_grouped["week"] = weekly_grouped["week"].astype(str)
-        features["weekly"] = weekly_grouped.to_dict(orient="records")
-
-        self.insights = {"transaction_features": clean_for_json(features)} 
+        self.insights = {"transaction_features": features}
         return self.insights["transaction_features"]
 
+    def transaction_features(self):
+        """
+        The transaction features of the current rows without modifying the table, so it's safe on a
+        table shared with other readers. Unlike extract_transaction_features nothing is cached here.
+        """
+        if not self.is_transaction_table:
+            return None
+        if self.insights.get("transaction_features") is not None:
+            return self.insights["transaction_features"]
+        engine = self._features if self._features is not None else TransactionFeatureEngine.from_table(self.table)
+        return engine.features()
+
 def clean_for_json(obj):
     """
     Recursively clean an object to make it JSON serializable by replacing
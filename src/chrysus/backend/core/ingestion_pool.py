@@ -0,0 +1,140 @@
+import os
+import copy
+import asyncio
+import threading
+import multiprocessing
+import pyarrow as pa
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from chrysus.backend.core.available_models import share_quota
+from chrysus.backend.core.informed_table import InformedTable
+from chrysus.backend.core.arrow_export import frame_to_arrow, arrow_to_frame
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# "thread" builds tables on the API process's default executor, "process" in an IngestionProcessPool
+INGESTION_MODE = os.environ.get("INGESTION_MODE", "thread").lower()
+_INGESTION_PROCESSES = int(os.environ.get("INGESTION_PROCESSES", "2"))
+
+
+def _init_worker(quota_processes: int) -> None:
+    share_quota(quota_processes)
+    # load the classifier once per worker instead of on the first table it builds
+    try:
+        InformedTable._get_classifier()
+    except Exception as e:
+        logger.error(f"Failed to preload the classifier in ingestion worker {os.getpid()}: {e}")
+
+
+def _encode_frame(table: InformedTable) -> bytes:
+    arrow_table = frame_to_arrow(table.table)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+
+def _decode_frame(data: bytes):
+    return arrow_to_frame(pa.ipc.open_stream(data).read_all())
+
+
+def build_table(table: Dict[str, Any], pdf_path: str) -> InformedTable:
+    """
+    Build (preprocess and classify) an InformedTable from an extracted table. Both ingestion modes build through here.
+    """
+    built = InformedTable(table['table'], copy.deepcopy(table['user_information']), pdf_path)
+    built.user_information['title'] = table.get('title', 'main table')
+    return built
+
+
+def encode_built_table(built: InformedTable) -> Dict[str, Any]:
+    """
+    The compact form of a built table that crosses back from a worker: the table as Arrow IPC bytes plus its small metadata.
+    restore_built_table(encode_built_table(built)) gives the same table, dtypes and fingerprints as built.
+    """
+    return {
+        "table": _encode_frame(built),
+        "user_information": built.user_information,
+        "pdf_path": built.pdf_path,
+        "transformation_history": built.transformation_history,
+        "insights": built.insights,
+        "is_transaction_table": built.is_transaction_table,
+    }
+
+
+def build_tables_in_worker(new_tables: List[Dict[str, Any]], pdf_path: str) -> List[Dict[str, Any]]:
+    """
+    Build InformedTables from extracted tables. Runs inside a worker process; only their encoded form crosses back.
+    """
+    return [encode_built_table(build_table(table, pdf_path)) for table in new_tables]
+
+
+def restore_built_table(payload: Dict[str, Any]) -> InformedTable:
+    return InformedTable.restore(
+        _decode_frame(payload["table"]),
+        user_information=payload["user_information"],
+        pdf_path=payload["pdf_path"],
+        transformation_history=payload["transformation_history"],
+        insights=payload["insights"],
+        is_transaction_table=payload["is_transaction_table"],
+    )
+
+
+class IngestionProcessPool:
+    """
+    Worker processes for the CPU-bound part of ingestion (date parsing, classification, table
+    building), so it doesn't hold the API process's GIL. Each worker preloads the classifier when
+    it starts; a PDF's tables are built in one worker and shipped back as Arrow IPC for the merge.
+    Starting the workers splits the model quotas between them and the API process.
+    """
+
+    def __init__(self, processes: int = _INGESTION_PROCESSES):
+        self.processes = max(1, processes)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # the workers and this process each pace model calls to their share of the quota
+                quota_processes = self.processes + 1
+                share_quota(quota_processes)
+                # spawn rather than fork: the API process is multi-threaded and forking it is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(quota_processes,),
+                )
+            return self._pool
+
+    def start(self) -> None:
+        """
+        Start the workers now rather than on the first ingestion, so their classifiers load in the background.
+        """
+        pool = self._get_pool()
+        for _ in range(self.processes):
+            pool.submit(os.getpid)
+
+    def warm(self, fn: Callable[[], Any]) -> None:
+        """
+        Run fn once per worker (best effort, the executor decides which worker takes each call) and wait for it.
+        fn must be a module-level function so it can be pickled.
+        """
+        pool = self._get_pool()
+        for future in [pool.submit(fn) for _ in range(self.processes)]:
+            future.result()
+
+    async def build_tables(self, new_tables: List[Dict[str, Any]], pdf_path: Path) -> List[InformedTable]:
+        loop = asyncio.get_running_loop()
+        payloads = await loop.run_in_executor(self._get_pool(), build_tables_in_worker, new_tables, str(pdf_path))
+        return [restore_built_table(payload) for payload in payloads]
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from chrysus import resolve_component_dirs_path
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# extraction covers pdf text/OCR + table extraction, classification covers BERT tagging and LLM
+# categorization while building each table, merge is unifying the tables into the account holder
+INGESTION_STAGES = ["extraction", "classification", "merge"]
+
+_INGESTION_WORKERS = int(os.environ.get("INGESTION_WORKERS", "2"))
+
+ProgressCallback = Callable[[str, str, Optional[int], Optional[int]], None]
+JobRunner = Callable[[Dict[str, Any], ProgressCallback], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobStore:
+    """
+    SQLite backed persistence for ingestion jobs so queued and in-flight jobs survive a restart.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path is not None else resolve_component_dirs_path("data") / "jobs.sqlite"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    pdf_path TEXT NOT NULL,
+                    filename TEXT,
+                    digest TEXT,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    stages TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "digest" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN digest TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_digest ON jobs (digest)")
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["stages"] = json.loads(job["stages"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, pdf_path: Path, filename: Optional[str] = None, priority: int = 0, digest: Optional[str] = None) -> Dict[str, Any]:
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "pdf_path": str(pdf_path),
+            "filename": filename,
+            "digest": digest,
+            "priority": priority,
+            "status": JOB_QUEUED,
+            "stages": {stage: {"state": "pending", "completed": None, "total": None} for stage in INGESTION_STAGES},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, pdf_path, filename, digest, priority, status, stages, result, error, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?)",
+                (job["id"], job["pdf_path"], filename, digest, priority, JOB_QUEUED, json.dumps(job["stages"]), now, now),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def find_by_digest(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recent job for this content that has not failed, i.e. one that is pending or succeeded.
+        A succeeded job's tables may be gone since (see AccountsController.holds_job_data).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE digest = ? AND status != ? ORDER BY created_at DESC LIMIT 1", (digest, JOB_FAILED)
+            ).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query, params = "SELECT * FROM jobs", []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if "stages" in fields:
+            fields["stages"] = json.dumps(fields["stages"])
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def update_stage(self, job_id: str, stage: str, state: str, completed: Optional[int] = None, total: Optional[int] = None) -> None:
+        # read-modify-write under one lock so progress from worker threads can't interleave
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row["stages"])
+            stages[stage] = {"state": state, "completed": completed, "total": total}
+            self._conn.execute(
+                "UPDATE jobs SET stages = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(stages), time.time(), job_id),
+            )
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at ASC", (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+
+class IngestionQueue:
+    """
+    Bounded pool of asyncio workers pulling ingestion jobs off a priority queue.
+    Higher priority jobs run first, ties run in submission order. Jobs that were queued or running
+    when the process stopped are picked up again on start.
+    """
+
+    def __init__(self, runner: JobRunner, store: Optional[JobStore] = None, workers: int = _INGESTION_WORKERS):
+        self.runner = runner
+        self.store = store if store is not None else JobStore()
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seq = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.PriorityQueue()
+        resumed = self.store.unfinished()
+        for job in resumed:
+            self.store.update(job["id"], status=JOB_QUEUED)
+            self._enqueue(job["id"], job["priority"])
+        if resumed:
+            logger.info(f"Resumed {len(resumed)} unfinished ingestion jobs")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} ingestion workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _enqueue(self, job_id: str, priority: int) -> None:
+        self._seq += 1
+        self._queue.put_nowait((-priority, self._seq, job_id))
+
+    def submit(self, pdf_path: Path, filename: Optional[str] = None, priority: int = 0, digest: Optional[str] = None) -> Dict[str, Any]:
+        job = self.store.create(pdf_path, filename=filename, priority=priority, digest=digest)
+        self._enqueue(job["id"], priority)
+        logger.info(f"Queued ingestion job {job['id']} for {filename or pdf_path} (priority {priority})")
+        return job
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] != JOB_QUEUED:
+            return
+        self.store.update(job_id, status=JOB_RUNNING)
+
+        def progress(stage: str, state: str, completed: Optional[int] = None, total: Optional[int] = None) -> None:
+            self.store.update_stage(job_id, stage, state, completed, total)
+
+        try:
+            result = await self.runner(job, progress)
+            self.store.update(job_id, status=JOB_SUCCEEDED, result=result)
+            logger.info(f"Ingestion job {job_id} succeeded")
+        except asyncio.CancelledError:
+            # shutting down mid-job: leave it running so it is resumed on the next start
+            raise
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}")
+            self.store.update(job_id, status=JOB_FAILED, error=str(e))
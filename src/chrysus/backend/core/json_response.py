@@ -0,0 +1,80 @@
+import math
+import hashlib
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+import orjson
+
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+# infer_dtype kinds of object columns whose values are already JSON-ready once nulls are None
+_PLAIN_OBJECT_KINDS = {"string", "empty", "boolean"}
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize to JSON bytes with orjson. NaN and +/-inf floats become null, numpy scalars and arrays
+    are written natively, and anything else orjson doesn't know falls back to str.
+    """
+    return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS)
+
+
+def _column_values(series: pd.Series, date_format: str) -> np.ndarray:
+    """
+    One column as an object array of JSON-ready Python values, nulls and +/-inf as None, in a handful of
+    NumPy operations. Only object columns holding more than text fall back to a pass over their cells.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.dt.strftime(date_format).to_numpy(dtype=object)
+        values[series.isna().to_numpy()] = None
+        return values
+    if pd.api.types.is_float_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+        floats = series.to_numpy()
+        # float64 -> object yields Python floats
+        values = floats.astype(object)
+        values[~np.isfinite(floats)] = None
+        return values
+    if (pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series)) and not pd.api.types.is_extension_array_dtype(series):
+        return series.to_numpy().astype(object)
+    values = series.to_numpy(dtype=object, na_value=None) if pd.api.types.is_extension_array_dtype(series) else series.to_numpy(dtype=object, copy=True)
+    values[pd.isna(values)] = None
+    if pd.api.types.infer_dtype(values, skipna=True) not in _PLAIN_OBJECT_KINDS:
+        # object columns can hold numpy scalars and +/-inf, which JSON encoders other than dumps reject
+        for i, value in enumerate(values):
+            if isinstance(value, np.generic):
+                value = value.item()
+            if isinstance(value, float) and not math.isfinite(value):
+                value = None
+            values[i] = value
+    return values
+
+
+def dataframe_to_records(df: pd.DataFrame, date_format: str = "%Y-%m-%d %H:%M:%S") -> List[Dict[str, Any]]:
+    """
+    The equivalent of clean_for_json(df.to_dict(orient="records")) with datetime columns formatted,
+    sanitized a column at a time: NaN, +/-inf and NaT become None and datetimes are formatted once per
+    column, so no per-cell type dispatch happens before the records are zipped together.
+    """
+    keys = list(df.columns)
+    columns = [_column_values(df.iloc[:, i], date_format) for i in range(len(keys))]
+    return [dict(zip(keys, row)) for row in zip(*columns)] if keys else [{} for _ in range(len(df))]
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Strong ETag from the content, so equal bodies share a tag across versions and restarts.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against etag. Uses the weak comparison RFC 9110 prescribes for
+    If-None-Match, i.e. a W/ prefix on either side is ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates)
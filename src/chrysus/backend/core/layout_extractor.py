@@ -0,0 +1,315 @@
+import re
+import asyncio
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from chrysus.utils.logger import get_logger
+from chrysus.backend.core.table_extractor import TableExtractor, run_sync
+from chrysus.backend.core.llm_extractor import LLMExtractor
+
+
+logger = get_logger(__name__)
+
+# Order matters: the first canonical name whose synonym is found in a header wins, so the more
+# specific names ("balance", "debit") are checked before the generic "amount".
+_HEADER_SYNONYMS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("balance", ("balance",)),
+    ("debit", ("debit", "withdrawal", "money out", "paid out", "charges")),
+    ("credit", ("credit", "deposit", "money in", "paid in")),
+    ("transaction_amount", ("amount", "amt")),
+    ("date", ("date", "posted")),
+    ("description", ("description", "particulars", "details", "narrative", "memo", "payee", "transaction")),
+]
+_OUTPUT_COLUMNS = ["date", "description", "transaction_amount", "balance"]
+
+_DATE_PATTERN = re.compile(
+    r"^(\d{1,2}[/.-]\d{1,2}([/.-]\d{2,4})?"
+    r"|\d{4}-\d{1,2}-\d{1,2}"
+    r"|[A-Za-z]{3,9}\.?\s+\d{1,2}(,?\s+\d{2,4})?"
+    r"|\d{1,2}\s+[A-Za-z]{3,9}\.?(,?\s+\d{2,4})?)$"
+)
+_AMOUNT_PATTERN = re.compile(r"^\(?-?[$£€]?\s*-?\d{1,3}(,?\d{3})*(\.\d{1,2})?\)?-?(\s*(CR|DR))?$", re.IGNORECASE)
+
+_TABLE_END_PATTERN = re.compile(r"^(total|ending balance|closing balance|statement balance)\b", re.IGNORECASE)
+
+_LINE_TOLERANCE = 3.0
+_PHRASE_GAP = 6.0
+_MIN_ROWS = 3
+_MIN_PARSE_RATIO = 0.9
+
+
+def normalize_header(header: Any) -> Optional[str]:
+    """
+    Map a raw column header onto the canonical schema used by InformedTable.
+    :param header: (Any): The header cell as found in the PDF.
+    :return: (str | None): One of date/description/transaction_amount/balance/debit/credit, or None.
+    """
+    text = re.sub(r"[^a-z ]+", " ", str(header or "").lower())
+    text = re.sub(r"\s+", " ", text).strip()
+    if not text:
+        return None
+    for canonical, synonyms in _HEADER_SYNONYMS:
+        if any(synonym in text for synonym in synonyms):
+            return canonical
+    return None
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """
+    Parse a currency cell into a float. Parentheses, a trailing minus and a DR suffix mean negative.
+    :return: (float | None): The amount, or None when the cell is not a number.
+    """
+    text = str(value or "").strip()
+    if not text or not _AMOUNT_PATTERN.match(text):
+        return None
+    negative = text.startswith("(") or text.startswith("-") or text.endswith("-") or text.upper().endswith("DR")
+    digits = re.sub(r"[^\d.]", "", text)
+    try:
+        amount = float(digits)
+    except ValueError:
+        return None
+    return -amount if negative else amount
+
+
+def _is_date(value: Any) -> bool:
+    return bool(_DATE_PATTERN.match(str(value or "").strip()))
+
+
+def _is_money(value: Any) -> bool:
+    # free-floating integers (page numbers, reference numbers) are not money, a cents part is required
+    return "." in str(value or "") and parse_amount(value) is not None
+
+
+class LayoutExtractor(TableExtractor):
+    """
+    Deterministic table extractor that rebuilds transaction tables from pdfplumber's ruled-table
+    and word-coordinate APIs, without any network calls. Headers are normalized to the
+    date/description/transaction_amount/balance schema InformedTable expects.
+    When the reconstructed tables fail the confidence check the document is handed to the
+    fallback extractor (the LLM path by default).
+    """
+
+    def __init__(self, fallback_extractor: Optional[TableExtractor] = None):
+        self._fallback_extractor = fallback_extractor
+
+    @property
+    def fallback_extractor(self) -> TableExtractor:
+        # the LLM extractor is only built once a document actually needs it (or its user information prompt)
+        if self._fallback_extractor is None:
+            self._fallback_extractor = LLMExtractor()
+        return self._fallback_extractor
+
+    def extract(self, pdf_path: Path) -> List[Dict[str, Any]]:
+        tables, page_texts = self._confident_tables_from_layout(pdf_path)
+        if tables is None:
+            return self.fallback_extractor.extract(pdf_path)
+        return self._build_results(tables, self._extract_user_information("\n".join(page_texts)))
+
+    async def aextract(self, pdf_path: Path) -> List[Dict[str, Any]]:
+        tables, page_texts = await asyncio.to_thread(self._confident_tables_from_layout, pdf_path)
+        if tables is None:
+            return await self.fallback_extractor.aextract(pdf_path)
+        return self._build_results(tables, await self._aextract_user_information("\n".join(page_texts)))
+
+    def _confident_tables_from_layout(self, pdf_path: Path) -> Tuple[Optional[List[List[List[Any]]]], List[str]]:
+        """
+        Returns the layout tables and page texts, or None for the tables when the fallback should be used.
+        """
+        try:
+            tables, page_texts = self._extract_tables_from_layout(pdf_path)
+        except Exception as e:
+            logger.error(f"Layout extraction failed for {pdf_path}: {e}")
+            tables, page_texts = [], []
+        if not tables or not all(self._is_confident(table) for table in tables):
+            logger.info(f"Layout extraction not confident for {pdf_path} - falling back to {self.fallback_extractor.__class__.__name__}")
+            return None, page_texts
+        logger.info(f"Layout extracted {len(tables)} tables from {pdf_path}")
+        return tables, page_texts
+
+    @staticmethod
+    def _build_results(tables: List[List[List[Any]]], user_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {
+                'table': table,
+                'title': 'transactions' if len(tables) == 1 else f'transactions ({i + 1})',
+                'table_number': i + 1,
+                'user_information': user_info,
+            }
+            for i, table in enumerate(tables)
+        ]
+
+    def _extract_user_information(self, text: str) -> Dict[str, Any]:
+        return run_sync(self._aextract_user_information(text))
+
+    async def _aextract_user_information(self, text: str) -> Dict[str, Any]:
+        # the holder details are free text, so this is the one step still delegated to the (small) LLM
+        aextract_user_information = getattr(self.fallback_extractor, "_aextract_user_information_from_text", None)
+        if aextract_user_information is None:
+            return {}
+        return await aextract_user_information(text)
+
+    def _extract_tables_from_layout(self, pdf_path: Path) -> Tuple[List[List[List[Any]]], List[str]]:
+        import pdfplumber
+
+        blocks: List[Tuple[List[str], List[List[Any]]]] = []
+        page_texts = []
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                page_texts.append(page.extract_text() or "")
+                blocks.extend(self._blocks_from_ruled_tables(page))
+            if not blocks:
+                anchors = None
+                for page in pdf.pages:
+                    page_blocks, anchors = self._blocks_from_words(page, anchors)
+                    blocks.extend(page_blocks)
+
+        # blocks that share a header layout are the same table continued across pages
+        grouped: Dict[Tuple[str, ...], List[List[Any]]] = {}
+        for header, rows in blocks:
+            grouped.setdefault(tuple(header), []).extend(rows)
+        tables = [self._to_output_table(list(header), rows) for header, rows in grouped.items()]
+        return [table for table in tables if table is not None], page_texts
+
+    @staticmethod
+    def _find_header(cells: List[Any]) -> Optional[List[Optional[str]]]:
+        header = [normalize_header(cell) for cell in cells]
+        has_amount = any(h in ("transaction_amount", "balance", "debit", "credit") for h in header)
+        if "date" in header and "description" in header and has_amount:
+            return header
+        return None
+
+    def _blocks_from_ruled_tables(self, page) -> List[Tuple[List[str], List[List[Any]]]]:
+        blocks = []
+        for raw_table in page.extract_tables():
+            rows = [[(cell or "").replace("\n", " ").strip() for cell in row] for row in raw_table if row]
+            for i, row in enumerate(rows):
+                header = self._find_header(row)
+                if header is None:
+                    continue
+                kept = [j for j, h in enumerate(header) if h is not None]
+                blocks.append(([header[j] for j in kept], [[row[j] for j in kept] for row in rows[i + 1:]]))
+                break
+        return blocks
+
+    @staticmethod
+    def _group_lines(words: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        lines: List[List[Dict[str, Any]]] = []
+        for word in sorted(words, key=lambda w: (round(w["top"]), w["x0"])):
+            if lines and abs(lines[-1][0]["top"] - word["top"]) <= _LINE_TOLERANCE:
+                lines[-1].append(word)
+            else:
+                lines.append([word])
+        return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+    @staticmethod
+    def _phrases(line: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        phrases = []
+        for word in line:
+            if phrases and word["x0"] - phrases[-1]["x1"] <= _PHRASE_GAP:
+                phrases[-1]["text"] += " " + word["text"]
+                phrases[-1]["x1"] = word["x1"]
+            else:
+                phrases.append({"text": word["text"], "x0": word["x0"], "x1": word["x1"]})
+        return phrases
+
+    def _header_anchors(self, line: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        phrases = self._phrases(line)
+        header = self._find_header([p["text"] for p in phrases])
+        if header is None:
+            return None
+        return [{"name": name, "x0": p["x0"], "x1": p["x1"]} for name, p in zip(header, phrases) if name is not None]
+
+    @staticmethod
+    def _assign_column(word: Dict[str, Any], anchors: List[Dict[str, Any]]) -> str:
+        # amounts are right aligned under their header, text is left aligned
+        if _is_money(word["text"]):
+            return min(anchors, key=lambda a: abs(a["x1"] - word["x1"]))["name"]
+        return min(anchors, key=lambda a: abs(a["x0"] - word["x0"]))["name"]
+
+    def _blocks_from_words(self, page, anchors: Optional[List[Dict[str, Any]]]) -> Tuple[List[Tuple[List[str], List[List[Any]]]], Optional[List[Dict[str, Any]]]]:
+        blocks = []
+        rows: List[Dict[str, str]] = []
+        for line in self._group_lines(page.extract_words()):
+            new_anchors = self._header_anchors(line)
+            if new_anchors is not None:
+                if anchors is not None and rows:
+                    blocks.append(self._rows_to_block(anchors, rows))
+                anchors, rows = new_anchors, []
+                continue
+            if anchors is None:
+                continue
+            cells: Dict[str, str] = {}
+            for word in line:
+                name = self._assign_column(word, anchors)
+                cells[name] = f"{cells[name]} {word['text']}" if name in cells else word["text"]
+            if _TABLE_END_PATTERN.match(" ".join(w["text"] for w in line)):
+                if rows:
+                    blocks.append(self._rows_to_block(anchors, rows))
+                anchors, rows = None, []
+                continue
+            has_date = _is_date(cells.get("date"))
+            has_number = any(_is_money(cells.get(n)) for n in ("transaction_amount", "balance", "debit", "credit"))
+            if has_date or (has_number and rows):
+                if not has_date:
+                    # statements commonly print the date once per day
+                    cells["date"] = rows[-1].get("date", "")
+                rows.append(cells)
+            elif rows and set(cells) <= {"description", "date"} and cells.get("description"):
+                rows[-1]["description"] = f"{rows[-1].get('description', '')} {cells['description']}".strip()
+        if anchors is not None and rows:
+            blocks.append(self._rows_to_block(anchors, rows))
+        return blocks, anchors
+
+    @staticmethod
+    def _rows_to_block(anchors: List[Dict[str, Any]], rows: List[Dict[str, str]]) -> Tuple[List[str], List[List[Any]]]:
+        header = [a["name"] for a in anchors]
+        return header, [[row.get(name, "") for name in header] for row in rows]
+
+    @staticmethod
+    def _to_output_table(header: List[str], rows: List[List[Any]]) -> Optional[List[List[Any]]]:
+        """
+        Collapse debit/credit columns into a signed transaction_amount and emit the canonical schema.
+        """
+        columns = [c for c in _OUTPUT_COLUMNS if c in header or (c == "transaction_amount" and ({"debit", "credit"} & set(header)))]
+        if "date" not in columns or "description" not in columns:
+            return None
+        table: List[List[Any]] = [columns]
+        description_idx = columns.index("description")
+        for row in rows:
+            cells = dict(zip(header, row))
+            if _TABLE_END_PATTERN.match(" ".join(str(c or "") for c in row).strip()):
+                break
+            has_values = any(parse_amount(cells.get(n)) is not None for n in ("transaction_amount", "balance", "debit", "credit"))
+            if not _is_date(cells.get("date")) and not has_values:
+                # wrapped description lines and blank filler rows of ruled tables
+                if len(table) > 1 and str(cells.get("description") or "").strip():
+                    table[-1][description_idx] = f"{table[-1][description_idx]} {cells['description'].strip()}"
+                continue
+            amount = parse_amount(cells.get("transaction_amount"))
+            if amount is None and ("debit" in cells or "credit" in cells):
+                debit, credit = parse_amount(cells.get("debit")), parse_amount(cells.get("credit"))
+                if debit is not None or credit is not None:
+                    amount = (credit or 0.0) - abs(debit or 0.0)
+            values = {
+                "date": str(cells.get("date", "")).strip(),
+                "description": str(cells.get("description", "")).strip(),
+                "transaction_amount": amount,
+                "balance": parse_amount(cells.get("balance")),
+            }
+            table.append([values[c] for c in columns])
+        return table
+
+    def _is_confident(self, table: List[List[Any]]) -> bool:
+        """
+        Accept a reconstructed table only when it is well-formed and nearly every row has a
+        recognisable date and a parsed amount or balance.
+        """
+        if not self._is_valid_table(table) or len(table) - 1 < _MIN_ROWS:
+            return False
+        header, rows = table[0], table[1:]
+        numeric_idx = [header.index(c) for c in ("transaction_amount", "balance") if c in header]
+        if not numeric_idx:
+            return False
+        date_idx = header.index("date")
+        dated = sum(1 for row in rows if _is_date(row[date_idx]))
+        valued = sum(1 for row in rows if any(row[i] is not None for i in numeric_idx))
+        return dated / len(rows) >= _MIN_PARSE_RATIO and valued / len(rows) >= _MIN_PARSE_RATIO
@@ -1,21 +1,33 @@
-import pdfplumber
+import os
+import asyncio
 import copy
-import pytesseract
 import re
 import json
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Union, Optional, Tuple, TYPE_CHECKING
+from collections import Counter
 from chrysus.utils.logger import get_logger
-from chrysus.backend.core.table_extractor import TableExtractor
+from chrysus.backend.core.table_extractor import TableExtractor, run_sync
+from chrysus.backend.core.extraction_cache import ExtractionCache, file_content_digest
+from chrysus.backend.core.page_ocr import PageOCREngine
 from pathlib import Path
-from langchain_core.language_models import BaseLanguageModel
-from chrysus.backend.core.available_models import gemini_2, gemini_2_5
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from chrysus.backend.core.available_models import get_model
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseLanguageModel
 
 # TODO: I should prob switch to using layoutparser instead of pytesseract. I want to be able to preserve the layout for the model
 # to be able to make better inferences... lets leave this for now and come back to it later
 
 logger = get_logger(__name__)
 
+# pages with fewer words than this from pdfplumber are treated as scanned and sent to OCR
+_MIN_WORDS_PER_PAGE = int(os.environ.get("OCR_MIN_WORDS_PER_PAGE", "20"))
+# long statements are extracted in overlapping page windows so a single reply can't hit the output-token limit
+_WINDOW_PAGES = int(os.environ.get("LLM_TABLE_WINDOW_PAGES", "4"))
+_WINDOW_OVERLAP_PAGES = int(os.environ.get("LLM_TABLE_WINDOW_OVERLAP_PAGES", "1"))
+_WINDOW_ATTEMPTS = 2
+_BOUNDARY_TAIL_ROWS = 100
+
 
 class LLMExtractor(TableExtractor):
     """
@@ -23,46 +35,107 @@ class LLMExtractor(TableExtractor):
     This class focuses purely on text-based table extraction without OCR or PDF parsing.
     """
     
-    def __init__(self, table_extractor_model: BaseLanguageModel = gemini_2_5, table_description_model: BaseLanguageModel = gemini_2, user_information_model: BaseLanguageModel = gemini_2):
-        """Initialize the LLM extractor with Gemini models."""
-        self.table_extractor_model = table_extractor_model
-        self.table_description_model = table_description_model
-        self.user_information_model = user_information_model
+    def __init__(self, table_extractor_model: Optional["BaseLanguageModel"] = None, table_description_model: Optional["BaseLanguageModel"] = None, user_information_model: Optional["BaseLanguageModel"] = None, extraction_cache: Optional[ExtractionCache] = None, ocr_engine: Optional[PageOCREngine] = None):
+        """
+        Initialize the LLM extractor with Gemini models.
+        Models left as None are the registry's defaults (gemini_2_5 for tables, gemini_2 otherwise), built on first use.
+        Results are cached on disk by PDF content hash unless DISABLE_EXTRACTION_CACHE=true.
+        """
+        self._table_extractor_model = table_extractor_model
+        self._table_description_model = table_description_model
+        self._user_information_model = user_information_model
+        if extraction_cache is None and os.environ.get("DISABLE_EXTRACTION_CACHE", "false").lower() != "true":
+            extraction_cache = ExtractionCache()
+        self.extraction_cache = extraction_cache
+        self.ocr_engine = ocr_engine if ocr_engine is not None else PageOCREngine()
+
+    @property
+    def table_extractor_model(self) -> "BaseLanguageModel":
+        return self._table_extractor_model if self._table_extractor_model is not None else get_model("gemini_2_5")
+
+    @property
+    def table_description_model(self) -> "BaseLanguageModel":
+        return self._table_description_model if self._table_description_model is not None else get_model("gemini_2")
+
+    @property
+    def user_information_model(self) -> "BaseLanguageModel":
+        return self._user_information_model if self._user_information_model is not None else get_model("gemini_2")
+
+    @staticmethod
+    def _model_signature(model: "BaseLanguageModel") -> Dict[str, Any]:
+        # the client behind the gateway, so routing calls through it doesn't change cache keys
+        model = getattr(model, "wrapped", model)
+        return {
+            "class": model.__class__.__name__,
+            "model": getattr(model, "model", None) or getattr(model, "model_name", None),
+            "temperature": getattr(model, "temperature", None),
+        }
+
+    def cache_config(self) -> Dict[str, Any]:
+        """
+        Describe everything about this extractor that changes its output, used to key the extraction cache.
+        """
+        return {
+            "extractor": self.__class__.__name__,
+            "table_extractor_model": self._model_signature(self.table_extractor_model),
+            "table_description_model": self._model_signature(self.table_description_model),
+            "user_information_model": self._model_signature(self.user_information_model),
+            "window_pages": [_WINDOW_PAGES, _WINDOW_OVERLAP_PAGES],
+        }
 
     def extract(self, pdf_path: Path):
-        all_text = self._extract_text_from_pdf(pdf_path)
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            # Run user info and table description in parallel
-            fut_user = executor.submit(self._extract_user_information_from_text, all_text)
-            fut_tables = executor.submit(self._describe_tables_in_text, all_text)
-            user_info = fut_user.result()
-            tables_info = fut_tables.result()
+        """
+        Sync entry point, runs aextract to completion. There is a single implementation of every
+        extraction step, the async one.
+        """
+        return run_sync(self.aextract(pdf_path))
+
+    async def aextract(self, pdf_path: Path):
+        """
+        Extract the tables of a PDF. Model calls go through ainvoke and the LLM gateway's per-model
+        limits, independent calls (user information, table descriptions, tables, page windows) run concurrently.
+        """
+        if self.extraction_cache is None:
+            return await self._aextract_uncached(pdf_path)
+        digest = await asyncio.to_thread(file_content_digest, pdf_path)
+        cache_key = self.extraction_cache.make_key(digest, self.cache_config())
+        cached = await asyncio.to_thread(self.extraction_cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"Extraction cache hit for {pdf_path} ({len(cached)} tables)")
+            return cached
+        results = await self._aextract_uncached(pdf_path)
+        if results:
+            await asyncio.to_thread(self.extraction_cache.put, cache_key, results)
+        return results
+
+    async def _aextract_uncached(self, pdf_path: Path):
+        pages = await asyncio.to_thread(self._extract_pages_from_pdf, pdf_path)
+        all_text = "".join(text + "\n" for text in pages)
+        user_info, tables_info = await asyncio.gather(
+            self._aextract_user_information_from_text(all_text),
+            self._adescribe_tables_in_text(all_text),
+        )
         if not tables_info:
-            main_table = self._extract_single_table_via_llm(all_text, "main")
+            main_table = await self._aextract_single_table_via_llm(all_text, "main", pages)
             if self._is_valid_table(main_table):
                 return [{'table': main_table, 'blurb': 'main table', 'user_information': user_info}]
             return []
         logger.info(f"LLM extracted {len(tables_info)} tables")
-        # Run table extractions in parallel
+        tables = await asyncio.gather(*[
+            self._aextract_single_table_via_llm(all_text, table_info, pages) for table_info in tables_info
+        ])
         results = []
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = {
-                executor.submit(self._extract_single_table_via_llm, all_text, table_info): table_info
-                for table_info in tables_info
-            }
-            for future in as_completed(futures):
-                table_info = futures[future]
-                table = future.result()
-                logger.info(f"Extracted table {table_info.get('table_number', -1)}")
-                if self._is_valid_table(table):
-                    results.append({
-                        'table': table,
-                        'title': table_info.get('blurb', 'main table'),
-                        'table_number': table_info.get('table_number', -1),
-                        'user_information': user_info,
-                    })
+        for table_info, table in zip(tables_info, tables):
+            logger.info(f"Extracted table {table_info.get('table_number', -1)}")
+            if self._is_valid_table(table):
+                results.append({
+                    'table': table,
+                    'title': table_info.get('blurb', 'main table'),
+                    'table_number': table_info.get('table_number', -1),
+                    'user_information': user_info,
+                })
         return results
-    
+
     def sequential_extract(self, pdf_path: Path) -> List[Dict[str, List[List]]]:
         """
         Extract tables from a PDF object by extracting text and then using LLM to parse tables.
@@ -75,43 +148,56 @@ class LLMExtractor(TableExtractor):
             represents a table. The dictionary should contain the table data as a list of lists. Other 
             keys can be added to store other data about the table where helpful.
         """
-        all_text = self._extract_text_from_pdf(pdf_path)
-        llm_tables = self._extract_tables_from_text(all_text)
-        summary_of_user_information = self._extract_user_information_from_text(all_text)
+        return run_sync(self._asequential_extract(pdf_path))
+
+    async def _asequential_extract(self, pdf_path: Path) -> List[Dict[str, List[List]]]:
+        all_text = await asyncio.to_thread(self._extract_text_from_pdf, pdf_path)
+        llm_tables = await self._aextract_tables_from_text(all_text)
+        summary_of_user_information = await self._aextract_user_information_from_text(all_text)
         logger.info(f"LLM extracted {len(llm_tables)} tables")
         for i in llm_tables:
             i['user_information'] = summary_of_user_information
         return llm_tables
 
-    def _extract_text_via_pdfplumber(self, pdf_path: Path) -> str:
-        all_text = ""
+    def _extract_pages_via_pdfplumber(self, pdf_path: Path) -> List[str]:
+        import pdfplumber
+
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                all_text += text + "\n"
-        return all_text
+            return [page.extract_text() or "" for page in pdf.pages]
+
+    def _extract_text_via_pdfplumber(self, pdf_path: Path) -> str:
+        return "".join(text + "\n" for text in self._extract_pages_via_pdfplumber(pdf_path))
 
     def _extract_text_via_ocr(self, pdf_path: Path) -> str:
-        ocr_text = ""
+        import pdfplumber
+
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                pil_img = page.to_image(resolution=300).original
-                ocr_text += pytesseract.image_to_string(pil_img) + "\n"
-        return ocr_text
+            page_count = len(pdf.pages)
+        ocr_pages = self.ocr_engine.ocr_pages(pdf_path, range(page_count))
+        return "".join(ocr_pages[i] + "\n" for i in range(page_count))
 
-    def _extract_text_from_pdf(self, pdf_path: Path) -> str:
-        all_text = self._extract_text_via_pdfplumber(pdf_path)
-        if not all_text:
+    def _extract_pages_from_pdf(self, pdf_path: Path) -> List[str]:
+        """
+        Extract the text of every page, falling back to OCR only for the pages where pdfplumber
+        did not return usable text (scanned pages, image-only inserts).
+        """
+        pages = self._extract_pages_via_pdfplumber(pdf_path)
+        if not any(pages):
             logger.warning("No text extracted from PDF")
-        if len(all_text.split()) < 100:
-            logger.warning("Not enough text present in the PDF - running OCR")
-            all_text = self._extract_text_via_ocr(pdf_path)
-        return all_text
+        missing = [i for i, text in enumerate(pages) if len(text.split()) < _MIN_WORDS_PER_PAGE]
+        if missing:
+            logger.warning(f"Not enough text present on {len(missing)}/{len(pages)} pages - running OCR on those pages")
+            for page_number, text in self.ocr_engine.ocr_pages(pdf_path, missing).items():
+                pages[page_number] = text
+        return pages
+
+    def _extract_text_from_pdf(self, pdf_path: Path) -> str:
+        return "".join(text + "\n" for text in self._extract_pages_from_pdf(pdf_path))
     
-    def _extract_tables_from_text(self, text: str) -> List[Dict[str, List[List]]]:
-        tables_info = self._describe_tables_in_text(text)
+    async def _aextract_tables_from_text(self, text: str) -> List[Dict[str, List[List]]]:
+        tables_info = await self._adescribe_tables_in_text(text)
         if not tables_info:
-            main_table = self._extract_single_table_via_llm(text, "main")
+            main_table = await self._aextract_single_table_via_llm(text, "main")
             if self._is_valid_table(main_table):
                 return [{'table': main_table, 'blurb': 'main table'}]
             return []
@@ -119,7 +205,7 @@ class LLMExtractor(TableExtractor):
         results = []
         for table_info in tables_info:
             logger.info(f"Extracting table {table_info.get('table_number', -1)}")
-            table = self._extract_single_table_via_llm(text, table_info)
+            table = await self._aextract_single_table_via_llm(text, table_info)
             logger.info(f"Extracting table {table_info.get('table_number', -1)}")
             if self._is_valid_table(table):
                 results.append({
@@ -131,8 +217,8 @@ class LLMExtractor(TableExtractor):
                 logger.warning(f"LLM extracted table {table_info.get('table_number', -1)} is not valid")
         return results
     
-    def _extract_user_information_from_text(self, text: str) -> Dict[str, Any]:
-        prompt = f"""
+    def _build_user_information_prompt(self, text: str) -> str:
+        return f"""
 <task>
 You are given text extracted from a PDF. Identify all of the user informationpresent in the text.
 You must try your best to extract the user information, return:
@@ -157,18 +243,24 @@ for unfound information, return "".
 </user_information>
 </output>
 """
+
+    @staticmethod
+    def _parse_user_information(content: str) -> Dict[str, Any]:
+        match = re.search(r"<user_information>(.*?)</user_information>", content, re.DOTALL)
+        if not match:
+            return {}
+        return json.loads(match.group(1))
+
+    async def _aextract_user_information_from_text(self, text: str) -> Dict[str, Any]:
         try:
-            response = self.user_information_model.invoke(prompt)
-            match = re.search(r"<user_information>(.*?)</user_information>", response.content, re.DOTALL)
-            if not match:
-                return {}
-            return json.loads(match.group(1))
+            response = await self.user_information_model.ainvoke(self._build_user_information_prompt(text))
+            return self._parse_user_information(response.content)
         except Exception as e:
             logger.error(f"Error extracting user information from text: {e}")
             return {}
 
-    def _describe_tables_in_text(self, text: str) -> List[Dict[str, Any]]:
-        prompt = f"""
+    def _build_describe_tables_prompt(self, text: str) -> str:
+        return f"""
 <task>
 You are given text extracted from a PDF. Identify all tables relevant to the account transactions or balances present in the text.
 For each table, return:
@@ -192,21 +284,35 @@ Respond as a JSON list, inside the XML tag, like:
 </tables>
 </output>
 """
+
+    @staticmethod
+    def _parse_table_descriptions(content: str) -> List[Dict[str, Any]]:
+        match = re.search(r"<tables>(.*?)</tables>", content, re.DOTALL)
+        if not match:
+            return []
+        return json.loads(match.group(1))
+
+    async def _adescribe_tables_in_text(self, text: str) -> List[Dict[str, Any]]:
         try:
-            response = self.table_description_model.invoke(prompt)
-            match = re.search(r"<tables>(.*?)</tables>", response.content, re.DOTALL)
-            if not match:
-                return []
-            
-            table_list = json.loads(match.group(1))
-            return table_list
+            response = await self.table_description_model.ainvoke(self._build_describe_tables_prompt(text))
+            return self._parse_table_descriptions(response.content)
         except Exception as e:
             logger.error(f"Error describing tables in text: {e}")
             return []
     
-    def _extract_single_table_via_llm(self, text: str, description_blurb: Dict[str, Any] = {"blurb": "main table"}) -> Union[List[List[Any]], None]:
+    def _build_table_prompt(self, text: str, description_blurb: Union[Dict[str, Any], str], pinned_header: Optional[List[str]] = None, window: Optional[Tuple[int, int, int]] = None) -> str:
+        if isinstance(description_blurb, str):
+            description_blurb = {"blurb": description_blurb}
         blurb_as_text = f"table with the following information: {' '.join(f'{k}: {v}' for k, v in description_blurb.items())}"
-        prompt = f"""
+        window_rules = ""
+        if window is not None:
+            start, end, total = window
+            window_rules += f"""- The input is only pages {start + 1}-{end} of a {total} page document. Return only the rows of the table that appear in this excerpt. If none of its rows appear here, return only the header row.
+"""
+        if pinned_header is not None:
+            window_rules += f"""- You MUST use exactly these column headers, in this order: {json.dumps(pinned_header)}
+"""
+        return f"""
 <task>
 You are given text extracted from a PDF. Your job is to extract the {blurb_as_text} in the text.
 - Return ONLY the table data, using JSON (list of lists).
@@ -217,7 +323,7 @@ You are given text extracted from a PDF. Your job is to extract the {blurb_as_te
 - The counterparty or description of column can commonly be found with names like Description, Particulars, Transaction Description, etc.,
 - Do not include any commentary or explanation.
 - row elements must be JSON serializable. If they are not sanatize the element to as close as possible to make it JSON serializable.
-- You MUST respond strictly within the provided XML tags. If you do not, the caller will not be able to parse your response.
+{window_rules}- You MUST respond strictly within the provided XML tags. If you do not, the caller will not be able to parse your response.
 We require the "<json_table>" tag to be present in your response.
 </task>
 <input>
@@ -229,18 +335,125 @@ We require the "<json_table>" tag to be present in your response.
 </json_table>
 </output>
 """
+
+    @staticmethod
+    def _parse_table_response(content: str) -> Union[List[List[Any]], None]:
+        match = re.search(r"<json_table>(.*?)</json_table>", content, re.DOTALL)
+        if not match:
+            return None
+        table = json.loads(match.group(1)).get('table')
+        if not table or not isinstance(table, list) or not all(isinstance(row, list) for row in table):
+            return None
+        return table
+
+    async def _ainvoke_table_prompt(self, prompt: str) -> Union[List[List[Any]], None]:
+        """
+        Run a table prompt and return the raw list-of-lists (header first), or None if the reply is unusable.
+        """
         try:
-            response = self.table_extractor_model.invoke(prompt)
-            match = re.search(r"<json_table>(.*?)</json_table>", response.content, re.DOTALL)
-            if not match:
-                return None
-            
-            table_json = json.loads(match.group(1))
-            if not self._is_valid_table(table_json.get('table')):
-                logger.warning(f"LLM extracted table is not valid: {table_json.get('table')}")
-                return None
-            return table_json.get('table')
+            response = await self.table_extractor_model.ainvoke(prompt)
+            return self._parse_table_response(response.content)
         except Exception as e:
             logger.error(f"Error extracting table via LLM: {e}")
             return None
-    
\ No newline at end of file
+
+    async def _aextract_single_table_via_llm(self, text: str, description_blurb: Union[Dict[str, Any], str] = {"blurb": "main table"}, pages: Optional[List[str]] = None) -> Union[List[List[Any]], None]:
+        if pages is not None and len(pages) > _WINDOW_PAGES:
+            return await self._aextract_single_table_via_windows(pages, description_blurb)
+        table = await self._ainvoke_table_prompt(self._build_table_prompt(text, description_blurb))
+        if not self._is_valid_table(table):
+            logger.warning(f"LLM extracted table is not valid: {table}")
+            return None
+        return table
+
+    @staticmethod
+    def _page_windows(pages: List[str]) -> List[Tuple[int, int, str]]:
+        step = max(1, _WINDOW_PAGES - _WINDOW_OVERLAP_PAGES)
+        windows = []
+        start = 0
+        while True:
+            end = min(start + _WINDOW_PAGES, len(pages))
+            windows.append((start, end, "".join(text + "\n" for text in pages[start:end])))
+            if end >= len(pages):
+                return windows
+            start += step
+
+    async def _aextract_window_rows(self, window: Tuple[int, int, str], total_pages: int, description_blurb: Union[Dict[str, Any], str], pinned_header: Optional[List[str]]) -> Union[List[List[Any]], None]:
+        """
+        Extract the rows of one page window. Returns the table (header first), or None when the reply
+        was unusable or doesn't line up with the pinned header.
+        """
+        start, end, text = window
+        for attempt in range(_WINDOW_ATTEMPTS):
+            table = await self._ainvoke_table_prompt(self._build_table_prompt(text, description_blurb, pinned_header, (start, end, total_pages)))
+            if table and (pinned_header is None or all(len(row) == len(pinned_header) for row in table)):
+                return table
+            logger.warning(f"Window pages {start + 1}-{end} returned an unusable table (attempt {attempt + 1}/{_WINDOW_ATTEMPTS})")
+        return None
+
+    @staticmethod
+    def _row_key(row: List[Any]) -> Tuple[str, ...]:
+        key = []
+        for cell in row:
+            try:
+                key.append(f"{float(str(cell).replace(',', '').replace('$', '')):.2f}")
+            except ValueError:
+                key.append(re.sub(r"\s+", " ", str(cell)).strip().lower())
+        return tuple(key)
+
+    def _stitch_windows(self, window_rows: List[List[List[Any]]]) -> List[List[Any]]:
+        """
+        Concatenate per-window rows, dropping the leading rows of each window that were already
+        emitted at the end of the previous one (the overlapping page). Matching is done against a
+        multiset of the previous tail so genuinely repeated transactions are kept.
+        """
+        rows: List[List[Any]] = []
+        for chunk in window_rows:
+            tail = Counter(self._row_key(row) for row in rows[-_BOUNDARY_TAIL_ROWS:])
+            skip = 0
+            for row in chunk:
+                key = self._row_key(row)
+                if tail[key] <= 0:
+                    break
+                tail[key] -= 1
+                skip += 1
+            rows.extend(chunk[skip:])
+        return rows
+
+    async def _aextract_single_table_via_windows(self, pages: List[str], description_blurb: Union[Dict[str, Any], str]) -> Union[List[List[Any]], None]:
+        """
+        Extract a long table window by window so no single reply runs into the output-token limit.
+        The header is pinned from the first window that contains the table, the remaining windows are
+        extracted concurrently and the rows are stitched back together in page order.
+        """
+        windows = self._page_windows(pages)
+        logger.info(f"Extracting table over {len(windows)} page windows")
+        header = None
+        window_rows: List[Union[List[List[Any]], None]] = [None] * len(windows)
+        first = 0
+        for first, window in enumerate(windows):
+            table = await self._aextract_window_rows(window, len(pages), description_blurb, None)
+            if table and len(table) > 1:
+                header, window_rows[first] = table[0], table[1:]
+                break
+        if header is None:
+            logger.warning("No page window contained the table")
+            return None
+
+        remaining = range(first + 1, len(windows))
+        tables = await asyncio.gather(*[
+            self._aextract_window_rows(windows[i], len(pages), description_blurb, header) for i in remaining
+        ])
+        for i, table in zip(remaining, tables):
+            window_rows[i] = table[1:] if table else None
+        return self._assemble_windows(windows, header, window_rows)
+
+    def _assemble_windows(self, windows: List[Tuple[int, int, str]], header: List[Any], window_rows: List[Union[List[List[Any]], None]]) -> Union[List[List[Any]], None]:
+        failed = [f"{start + 1}-{end}" for (start, end, _), rows in zip(windows, window_rows) if rows is None]
+        if failed:
+            logger.error(f"Table extraction failed for page windows {failed}; those rows are missing")
+        table = [header] + self._stitch_windows([rows for rows in window_rows if rows])
+        if not self._is_valid_table(table):
+            logger.warning(f"Stitched table is not valid: {table}")
+            return None
+        return table
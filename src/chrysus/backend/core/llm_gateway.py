@@ -0,0 +1,336 @@
+import os
+import re
+import math
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, TYPE_CHECKING
+from chrysus.backend.core.prompt_builder import estimate_tokens
+from chrysus.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseLanguageModel
+
+
+logger = get_logger(__name__)
+
+# ceiling of the adaptive concurrency limit of each model; the limit starts at LLM_INITIAL_CONCURRENCY and moves within [1, ceiling]
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
+_INITIAL_CONCURRENCY = int(os.environ.get("LLM_INITIAL_CONCURRENCY", "4"))
+_MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", "5"))
+_BACKOFF_BASE_SECONDS = float(os.environ.get("LLM_BACKOFF_BASE_SECONDS", "1"))
+_BACKOFF_MAX_SECONDS = float(os.environ.get("LLM_BACKOFF_MAX_SECONDS", "60"))
+# a burst of 429s from one overloaded window only halves the limit once
+_DECREASE_COOLDOWN_SECONDS = 1.0
+# how often a caller waiting for a free concurrency slot checks again
+_SLOT_POLL_SECONDS = 0.05
+_WAIT_SAMPLES = 1024
+
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_THROTTLE_STATUS = {429, 503}
+_THROTTLE_PATTERN = re.compile(r"\b429\b|resource.?exhausted|rate.?limit|quota|too many requests", re.IGNORECASE)
+_TRANSIENT_PATTERN = re.compile(r"\b(500|502|503|504)\b|unavailable|deadline|timed? ?out|connection (reset|aborted|error)", re.IGNORECASE)
+_RETRY_DELAY_PATTERNS = [
+    re.compile(r"retry in ([0-9.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*([0-9]+)", re.IGNORECASE),
+    re.compile(r"retry-after[\"']?\s*[:=]\s*[\"']?([0-9.]+)", re.IGNORECASE),
+]
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        value = getattr(value, "value", value)  # HTTPStatus / grpc-style enums
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_throttle(error: BaseException) -> bool:
+    status = _status_code(error)
+    if status is not None:
+        return status in _THROTTLE_STATUS
+    return bool(_THROTTLE_PATTERN.search(str(error)))
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    message = str(error)
+    return bool(_THROTTLE_PATTERN.search(message) or _TRANSIENT_PATTERN.search(message))
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    The delay the server asked for, from a retry_after attribute, a Retry-After header or the error message.
+    """
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers is not None:
+            value = headers.get("retry-after")
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+    message = str(error)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def backoff_seconds(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff for the given (0 based) retry, never shorter than what the server asked for.
+    """
+    delay = random.uniform(0, min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after) if retry_after is not None else delay
+
+
+def _prompt_tokens(prompt: Any) -> int:
+    if isinstance(prompt, str):
+        return estimate_tokens(prompt)
+    if isinstance(prompt, (list, tuple)):
+        return sum(estimate_tokens(str(getattr(message, "content", message))) for message in prompt)
+    return estimate_tokens(str(prompt))
+
+
+def _used_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and usage.get("total_tokens") is not None:
+        return int(usage["total_tokens"])
+    return None
+
+
+class ModelLimiter:
+    """
+    Admission control for one model: token buckets for requests/min and tokens/min, a pause
+    honoring the server's retry-after, and an AIMD concurrency limit (additive increase on
+    success, halved on throttling). All state sits behind one lock so threads and event loops
+    share it; callers sleep for the wait it hands back, in their own way.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: float, max_concurrency: int = LLM_MAX_CONCURRENCY, initial_concurrency: int = _INITIAL_CONCURRENCY):
+        self.name = name
+        self.rpm = float(rpm)
+        self.tpm = float(tpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self._lock = threading.Lock()
+        now = time.monotonic()
+        self._requests = self.rpm
+        self._tokens = self.tpm
+        self._refilled_at = now
+        self._blocked_until = 0.0
+        self._limit = float(min(max(1, initial_concurrency), self.max_concurrency))
+        self._decreased_at = 0.0
+        self._in_flight = 0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0, "tokens": 0, "wait_total_seconds": 0.0, "wait_max_seconds": 0.0}
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Take a concurrency slot, one request and the estimated tokens if all are available.
+        :return: (float): 0 when acquired, otherwise how long to wait before trying again.
+        """
+        # a prompt bigger than the whole minute's budget still has to go through eventually
+        tokens = min(tokens, self.tpm)
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill(now)
+            if self._in_flight >= int(self._limit):
+                return _SLOT_POLL_SECONDS
+            if self._requests < 1:
+                return (1 - self._requests) * 60 / self.rpm
+            if self._tokens < tokens:
+                return (tokens - self._tokens) * 60 / self.tpm
+            self._requests -= 1
+            self._tokens -= tokens
+            self._in_flight += 1
+            return 0.0
+
+    def set_quota(self, rpm: float, tpm: float) -> None:
+        """
+        Change the requests/min and tokens/min quota, e.g. when it becomes shared with other processes.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rpm = float(rpm)
+            self.tpm = float(tpm)
+            self._requests = min(self._requests, self.rpm)
+            self._tokens = min(self._tokens, self.tpm)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self._stats["wait_total_seconds"] += seconds
+            self._stats["wait_max_seconds"] = max(self._stats["wait_max_seconds"], seconds)
+
+    def release(self, estimated_tokens: int, used_tokens: Optional[int], error: Optional[BaseException] = None, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._in_flight -= 1
+            self._stats["requests"] += 1
+            if used_tokens is not None:
+                # settle the estimate against what the model reported, which can take the bucket below zero
+                self._tokens -= used_tokens - min(estimated_tokens, self.tpm)
+                self._stats["tokens"] += used_tokens
+            if error is None:
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+                return
+            if is_throttle(error):
+                self._stats["throttled"] += 1
+                if now - self._decreased_at >= _DECREASE_COOLDOWN_SECONDS:
+                    self._limit = max(1.0, self._limit / 2)
+                    self._decreased_at = now
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def abandon(self) -> None:
+        """
+        Give back the slot of a call that was cancelled or interrupted, without counting it as a request or an error.
+        """
+        with self._lock:
+            self._in_flight -= 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self._stats["retries"] += 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = dict(self._stats)
+            stats.update({
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "blocked_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            })
+        stats["wait_p50_seconds"] = waits[len(waits) // 2] if waits else 0.0
+        stats["wait_p95_seconds"] = waits[min(len(waits) - 1, math.ceil(len(waits) * 0.95) - 1)] if waits else 0.0
+        stats["wait_total_seconds"] = round(stats["wait_total_seconds"], 3)
+        return stats
+
+
+class GatewayModel:
+    """
+    A model client behind its limiter. invoke/ainvoke wait for admission, retry transient errors
+    and 429s with jittered exponential backoff (honoring retry-after) and raise the last error once
+    the attempts are used up; any other attribute is the wrapped client's.
+    """
+
+    def __init__(self, wrapped: "BaseLanguageModel", limiter: ModelLimiter, max_attempts: int = _MAX_ATTEMPTS):
+        self.wrapped = wrapped
+        self.limiter = limiter
+        self.max_attempts = max(1, max_attempts)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "wrapped":
+            raise AttributeError(name)
+        return getattr(self.wrapped, name)
+
+    def _settle(self, estimated: int, response: Any = None, error: Optional[BaseException] = None) -> Optional[float]:
+        retry_after = retry_after_seconds(error) if error is not None else None
+        self.limiter.release(estimated, _used_tokens(response), error, retry_after)
+        return retry_after
+
+    def _give_up(self, attempt: int, error: BaseException) -> bool:
+        if attempt + 1 >= self.max_attempts or not is_retryable(error):
+            self.limiter.record_failure()
+            return True
+        self.limiter.record_retry()
+        logger.warning(f"{self.limiter.name} call failed (attempt {attempt + 1}/{self.max_attempts}), retrying: {error}")
+        return False
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        estimated = _prompt_tokens(prompt)
+        for attempt in range(self.max_attempts):
+            start = time.monotonic()
+            while (wait := self.limiter.try_acquire(estimated)) > 0:
+                time.sleep(wait)
+            self.limiter.record_wait(time.monotonic() - start)
+            settled = False
+            try:
+                response = self.wrapped.invoke(prompt, **kwargs)
+            except Exception as e:
+                settled = True
+                retry_after = self._settle(estimated, error=e)
+                if self._give_up(attempt, e):
+                    raise
+            else:
+                settled = True
+                self._settle(estimated, response)
+                return response
+            finally:
+                if not settled:
+                    # cancelled or interrupted (CancelledError, KeyboardInterrupt): the slot still goes back
+                    self.limiter.abandon()
+            time.sleep(backoff_seconds(attempt, retry_after))
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> Any:
+        estimated = _prompt_tokens(prompt)
+        for attempt in range(self.max_attempts):
+            start = time.monotonic()
+            while (wait := self.limiter.try_acquire(estimated)) > 0:
+                await asyncio.sleep(wait)
+            self.limiter.record_wait(time.monotonic() - start)
+            settled = False
+            try:
+                response = await self.wrapped.ainvoke(prompt, **kwargs)
+            except Exception as e:
+                settled = True
+                retry_after = self._settle(estimated, error=e)
+                if self._give_up(attempt, e):
+                    raise
+            else:
+                settled = True
+                self._settle(estimated, response)
+                return response
+            finally:
+                if not settled:
+                    # cancelled or interrupted (CancelledError, KeyboardInterrupt): the slot still goes back
+                    self.limiter.abandon()
+            await asyncio.sleep(backoff_seconds(attempt, retry_after))
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str, rpm: float, tpm: float) -> ModelLimiter:
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = ModelLimiter(name, rpm, tpm)
+        return _limiters[name]
+
+
+def gateway_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-model admission and retry metrics, including how long calls waited for admission (queue wait).
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
@@ -0,0 +1,78 @@
+import os
+import threading
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+_OCR_RESOLUTION = int(os.environ.get("OCR_RESOLUTION", "300"))
+_OCR_MAX_WORKERS = int(os.environ.get("OCR_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _ocr_single_page(job: Tuple[str, int, int]) -> Tuple[int, str]:
+    """
+    Render one page and OCR it. Runs inside a worker process, so only the page number and the
+    text cross the process boundary; the rendered image is dropped as soon as tesseract is done.
+    """
+    import pdfplumber
+    import pytesseract
+
+    pdf_path, page_number, resolution = job
+    with pdfplumber.open(pdf_path) as pdf:
+        pil_img = pdf.pages[page_number].to_image(resolution=resolution).original
+        text = pytesseract.image_to_string(pil_img)
+        del pil_img
+    return page_number, text
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the API process is multi-threaded and forking it is not safe
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_ocr_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class PageOCREngine:
+    """
+    Page-level OCR that only processes the pages it is asked for and fans them out over a shared
+    process pool. Each worker renders and OCRs a single page at a time, so at most `max_workers`
+    rendered pages exist in memory at once.
+    """
+
+    def __init__(self, max_workers: int = _OCR_MAX_WORKERS, resolution: int = _OCR_RESOLUTION):
+        self.max_workers = max(1, max_workers)
+        self.resolution = resolution
+
+    def ocr_pages(self, pdf_path: Union[Path, str], page_numbers: Iterable[int]) -> Dict[int, str]:
+        """
+        OCR the given (0-based) pages of a PDF.
+        :param pdf_path: (Path | str): The PDF to OCR.
+        :param page_numbers: (Iterable[int]): The pages to OCR.
+        :return: (Dict[int, str]): OCR text keyed by page number.
+        """
+        jobs = [(str(pdf_path), page_number, self.resolution) for page_number in sorted(set(page_numbers))]
+        if not jobs:
+            return {}
+        logger.info(f"Running OCR on {len(jobs)} page(s) of {pdf_path}")
+        # a single page isn't worth the round trip to the pool
+        if len(jobs) == 1 or self.max_workers == 1:
+            return dict(_ocr_single_page(job) for job in jobs)
+        pool = _get_pool(self.max_workers)
+        return dict(pool.map(_ocr_single_page, jobs, chunksize=1))
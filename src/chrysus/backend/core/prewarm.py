@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from chrysus.backend.core.available_models import MODEL_SPECS, get_model
+from chrysus.backend.core.informed_table import InformedTable
+from chrysus.backend.core.ingestion_pool import IngestionProcessPool
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# load and warm the heavy paths in the background at startup; /readyz answers 503 until that's done
+PREWARM_MODELS = os.environ.get("PREWARM_MODELS", "false").lower() == "true"
+# also send each LLM client one tiny prompt so the TLS handshake and connection pool are set up (costs a request per model)
+PREWARM_LLM_CALL = os.environ.get("PREWARM_LLM_CALL", "false").lower() == "true"
+
+STEP_PENDING = "pending"
+STEP_RUNNING = "running"
+STEP_DONE = "done"
+STEP_FAILED = "failed"
+
+# a small batch of statement-like descriptions; enough to run the tokenizer and one forward pass
+WARMUP_DESCRIPTIONS = [
+    "PAYROLL DEPOSIT ACME CORP",
+    "NETFLIX.COM 866-579-7172 CA",
+    "SHELL OIL 57444 HOUSTON TX",
+    "NSF RETURNED ITEM FEE",
+]
+
+
+def warm_classifier() -> None:
+    """
+    Load the classifier (model weights and tokenizer) and run one dummy batch through it.
+    """
+    InformedTable._get_classifier().classify(WARMUP_DESCRIPTIONS)
+
+
+def warm_llm_clients(call: bool = PREWARM_LLM_CALL) -> None:
+    for name in MODEL_SPECS:
+        model = get_model(name)
+        if call:
+            model.invoke("Reply with OK.")
+
+
+class Prewarmer:
+    """
+    Runs the warm-up steps once, on a background thread, and records how each went.
+    Readiness means every step finished; a failed step is reported but doesn't hold readiness back,
+    the path it covers just loads on first use as it would without prewarming.
+    """
+
+    def __init__(self, enabled: bool = PREWARM_MODELS, ingestion_pool: Optional[IngestionProcessPool] = None):
+        """
+        :param ingestion_pool: (IngestionProcessPool | None): When ingestion runs in worker processes the classifier is warmed in the workers instead of this process.
+        """
+        self.enabled = enabled
+        self.steps: List[Tuple[str, Callable[[], Any]]] = [
+            ("classifier", (lambda: ingestion_pool.warm(warm_classifier)) if ingestion_pool is not None else warm_classifier),
+            ("llm_clients", warm_llm_clients),
+        ]
+        self._status: Dict[str, Dict[str, Any]] = {name: {"state": STEP_PENDING} for name, _ in self.steps}
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if not enabled:
+            self._ready.set()
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        for name, step in self.steps:
+            self._status[name] = {"state": STEP_RUNNING}
+            step_start = time.perf_counter()
+            try:
+                step()
+                self._status[name] = {"state": STEP_DONE, "seconds": round(time.perf_counter() - step_start, 3)}
+            except Exception as e:
+                logger.error(f"Prewarm step {name} failed: {e}")
+                self._status[name] = {"state": STEP_FAILED, "seconds": round(time.perf_counter() - step_start, 3), "error": str(e)}
+        self._ready.set()
+        logger.info(f"Prewarm finished in {time.perf_counter() - start:.2f}s: {self._status}")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "prewarm": self.enabled, "steps": dict(self._status) if self.enabled else {}}
@@ -0,0 +1,228 @@
+import os
+import re
+import math
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from chrysus.backend.core.category_cache import normalize_description
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+RECOMMENDATION_TOKEN_BUDGET = int(os.environ.get("RECOMMENDATION_TOKEN_BUDGET", "32000"))
+# days before the latest transaction that count as the most recent period when selecting evidence
+RECOMMENDATION_RECENT_DAYS = int(os.environ.get("RECOMMENDATION_RECENT_DAYS", "30"))
+# share of the transaction budget the most recent period may take before the largest flows get the rest
+_RECENT_SHARE = 0.5
+# tabular text with numbers and short keys tokenizes denser than prose; erring low keeps estimates on the high side
+_CHARS_PER_TOKEN = 3.5
+# weekly insights grow with history, so only the latest weeks are kept when the fixed sections are over budget
+_TRIMMED_WEEKLY_ROWS = 26
+_TRIMMED_DESCRIPTIVE_ROWS = 50
+
+_SHORT_KEYS = {
+    "date": "d",
+    "description": "desc",
+    "transaction_amount": "amt",
+    "balance": "bal",
+    "tag": "cat",
+    # pre-unify tables can carry both the classifier's txn_category and a tag, so each needs its own key
+    "txn_category": "tcat",
+}
+KEY_LEGEND = "d=date, desc=description, amt=transaction amount (negative is money out), bal=balance, cat=category, tcat=classifier category"
+
+_BOUNCED_PATTERN = re.compile(r"\b(?:NSF|NON[- ]?SUFFICIENT|INSUFFICIENT|RETURNED?|RTN|BOUNCED?|OVERDRAFT|OD FEE|CHARGEBACK|REVERSAL)\b", re.IGNORECASE)
+_DEBT_PATTERN = re.compile(r"\b(?:LOANS?|MORTGAGE|CREDIT CA?RD|CRD|AUTOPAY|LENDING|FINANCING|FINANCE|LEASE|DEBT|INSTALL?MENT)\b", re.IGNORECASE)
+
+_SELECTION_CODES = {"bounced": "b", "recurring_debt": "d", "recent": "r", "largest_flow": "l"}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+def _format_column(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%d").fillna("")
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return series.astype(str)
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=float)
+        finite = np.isfinite(values)
+        formatted = np.full(len(values), "", dtype=object)
+        formatted[finite] = np.char.mod("%.2f", values[finite])
+        return pd.Series(formatted, index=series.index).str.replace(r"\.?0+$", "", regex=True)
+    return series.fillna("").astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def encode_rows(df: pd.DataFrame) -> Tuple[str, pd.Series]:
+    """
+    Encode a DataFrame as tab separated lines with short column keys.
+    :param df: (pd.DataFrame): The table to encode.
+    :return: (Tuple[str, pd.Series]): The header line and one encoded line per row, aligned with df's index.
+    """
+    header = "\t".join(_SHORT_KEYS.get(str(column), str(column)) for column in df.columns)
+    if df.empty:
+        return header, pd.Series([], dtype=object)
+    columns = [_format_column(df[column]) for column in df.columns]
+    lines = columns[0].str.cat(columns[1:], sep="\t") if len(columns) > 1 else columns[0]
+    return header, lines
+
+
+def encode_table(df: pd.DataFrame) -> str:
+    header, lines = encode_rows(df)
+    return "\n".join([header, *lines.tolist()])
+
+
+def encode_insights(insights: Dict[str, Any]) -> str:
+    """
+    Encode the base insights (sections of records, as produced by extract_transaction_features) as one TSV block per section.
+    """
+    sections = []
+    for name, records in insights.items():
+        if isinstance(records, list):
+            sections.append(f"[{name}]\n{encode_table(pd.DataFrame(records))}" if records else f"[{name}]")
+        else:
+            sections.append(f"[{name}] {records}")
+    return "\n\n".join(sections)
+
+
+def encode_descriptive_tables(tables: List[Tuple[str, pd.DataFrame]], max_rows: Optional[int] = None) -> str:
+    blocks = []
+    for title, df in tables:
+        shown = df if max_rows is None else df.head(max_rows)
+        note = f" (first {len(shown)} of {len(df)} rows)" if len(shown) < len(df) else ""
+        blocks.append(f"[{title}]{note}\n{encode_table(shown)}")
+    return "\n\n".join(blocks)
+
+
+def _recurring_debt_mask(transactions: pd.DataFrame) -> np.ndarray:
+    text = transactions["description"].fillna("").astype(str) if "description" in transactions.columns else pd.Series("", index=transactions.index)
+    is_debt = text.str.contains(_DEBT_PATTERN)
+    if "tag" in transactions.columns:
+        is_debt |= transactions["tag"].fillna("").astype(str).str.contains(_DEBT_PATTERN)
+    if not is_debt.any():
+        return is_debt.to_numpy()
+    merchants = text[is_debt].map(normalize_description)
+    recurring = merchants.map(merchants.value_counts()) >= 2
+    mask = np.zeros(len(transactions), dtype=bool)
+    mask[np.flatnonzero(is_debt.to_numpy())[recurring.to_numpy()]] = True
+    return mask
+
+
+def select_evidence_rows(transactions: pd.DataFrame, row_tokens: np.ndarray, token_budget: int, recent_days: int = RECOMMENDATION_RECENT_DAYS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pick the rows that best support a credit decision within a token budget.
+    Candidates are taken in priority order: bounced/NSF items, recurring debt payments, the most recent
+    period (capped at a share of the budget), then the largest flows by absolute amount; within each
+    group the newest or largest rows come first.
+    :param transactions: (pd.DataFrame): Date-sorted transaction table.
+    :param row_tokens: (np.ndarray): Estimated tokens of each encoded row.
+    :param token_budget: (int): Tokens available for the rows.
+    :return: (Tuple[np.ndarray, np.ndarray]): Positions of the selected rows in table order, and the selection code of each.
+    """
+    n = len(transactions)
+    positions = np.arange(n)
+    description = transactions["description"].fillna("").astype(str) if "description" in transactions.columns else pd.Series("", index=transactions.index)
+    amounts = pd.to_numeric(transactions["transaction_amount"], errors="coerce").to_numpy(dtype=float) if "transaction_amount" in transactions.columns else np.zeros(n)
+    dates = pd.to_datetime(transactions["date"], errors="coerce") if "date" in transactions.columns else pd.Series(pd.NaT, index=transactions.index)
+
+    newest_first = positions[::-1]
+    bounced = newest_first[description.str.contains(_BOUNCED_PATTERN).to_numpy()[::-1]]
+    debts = newest_first[_recurring_debt_mask(transactions)[::-1]]
+    if dates.notna().any():
+        recent_mask = (dates >= dates.max() - pd.Timedelta(days=recent_days)).to_numpy()
+        recent = newest_first[recent_mask[::-1]]
+    else:
+        recent = newest_first
+    largest = np.argsort(-np.nan_to_num(np.abs(amounts), nan=-1.0), kind="stable")
+
+    codes = np.full(n, "", dtype=object)
+    remaining = token_budget
+
+    def take(candidates: np.ndarray, code: str, limit: int) -> int:
+        candidates = candidates[codes[candidates] == ""]
+        fits = np.cumsum(row_tokens[candidates]) <= limit
+        # cumsum is monotonic so the rows that fit are a prefix
+        chosen = candidates[fits]
+        codes[chosen] = code
+        return int(row_tokens[chosen].sum())
+
+    remaining -= take(bounced, _SELECTION_CODES["bounced"], remaining)
+    remaining -= take(debts, _SELECTION_CODES["recurring_debt"], remaining)
+    remaining -= take(recent, _SELECTION_CODES["recent"], int(remaining * _RECENT_SHARE))
+    remaining -= take(largest, _SELECTION_CODES["largest_flow"], remaining)
+    # whatever the largest flows didn't need goes back to the recent period
+    take(recent, _SELECTION_CODES["recent"], remaining)
+
+    selected = np.flatnonzero(codes != "")
+    return selected, codes[selected]
+
+
+def build_recommendation_prompt(
+    template: str,
+    base_insights: Dict[str, Any],
+    descriptive_tables: List[Tuple[str, pd.DataFrame]],
+    transactions: pd.DataFrame,
+    token_budget: int = RECOMMENDATION_TOKEN_BUDGET,
+) -> Dict[str, Any]:
+    """
+    Fill the recommendation template with compactly encoded client data, keeping it within a token budget.
+    The template must contain {base_insights}, {descriptive_tables} and {transaction_table} placeholders.
+    Insights and descriptive tables are included first (trimmed only if they alone overflow the budget);
+    the transaction table is included whole when it fits, otherwise as a selection of evidence rows.
+    :return: (Dict[str, Any]): "prompt", "token_counts" per section and total, and "transaction_rows" included/total/selected_by.
+    """
+    instructions_tokens = estimate_tokens(template.format(base_insights="", descriptive_tables="", transaction_table=""))
+    insights_text = encode_insights(base_insights)
+    descriptive_text = encode_descriptive_tables(descriptive_tables)
+
+    if instructions_tokens + estimate_tokens(insights_text) + estimate_tokens(descriptive_text) > token_budget:
+        if isinstance(base_insights.get("weekly"), list) and len(base_insights["weekly"]) > _TRIMMED_WEEKLY_ROWS:
+            base_insights = {**base_insights, "weekly": base_insights["weekly"][-_TRIMMED_WEEKLY_ROWS:]}
+            insights_text = encode_insights(base_insights)
+        descriptive_text = encode_descriptive_tables(descriptive_tables, max_rows=_TRIMMED_DESCRIPTIVE_ROWS)
+
+    fixed_tokens = instructions_tokens + estimate_tokens(insights_text) + estimate_tokens(descriptive_text)
+    header, lines = encode_rows(transactions)
+    full_text = "\n".join([f"legend: {KEY_LEGEND}", header, *lines.tolist()])
+    total_rows = len(transactions)
+    selected_by: Dict[str, int] = {}
+
+    if fixed_tokens + estimate_tokens(full_text) <= token_budget:
+        transaction_text = full_text
+        included_rows = total_rows
+    else:
+        row_tokens = np.ceil((lines.str.len().to_numpy(dtype=float) + 3) / _CHARS_PER_TOKEN).astype(np.int64)
+
+        def preamble(included: int) -> str:
+            return (
+                f"note: {included} of {total_rows} transactions, selected as evidence; use base_insights for totals. "
+                f"sel: b=bounced/NSF, d=recurring debt payment, r=last {RECOMMENDATION_RECENT_DAYS} days, l=largest flows\n"
+                f"legend: {KEY_LEGEND}\n{header}\tsel"
+            )
+
+        row_budget = max(0, token_budget - fixed_tokens - estimate_tokens(preamble(total_rows)))
+        selected, codes = select_evidence_rows(transactions, row_tokens, row_budget)
+        selected_lines = lines.iloc[selected].str.cat(pd.Series(codes, index=lines.index[selected]), sep="\t")
+        transaction_text = "\n".join([preamble(len(selected)), *selected_lines.tolist()])
+        included_rows = len(selected)
+        for name, code in _SELECTION_CODES.items():
+            selected_by[name] = int((codes == code).sum())
+
+    prompt = template.format(base_insights=insights_text, descriptive_tables=descriptive_text, transaction_table=transaction_text)
+    token_counts = {
+        "instructions": instructions_tokens,
+        "base_insights": estimate_tokens(insights_text),
+        "descriptive_tables": estimate_tokens(descriptive_text),
+        "transaction_table": estimate_tokens(transaction_text),
+        "total": estimate_tokens(prompt),
+        "budget": token_budget,
+    }
+    logger.info(f"Built recommendation prompt: {token_counts['total']} tokens (budget {token_budget}), {included_rows} of {total_rows} transactions")
+    return {
+        "prompt": prompt,
+        "token_counts": token_counts,
+        "transaction_rows": {"included": included_rows, "total": total_rows, "selected_by": selected_by},
+    }
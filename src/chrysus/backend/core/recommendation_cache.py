@@ -0,0 +1,96 @@
+import os
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+_RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.environ.get("RECOMMENDATION_CACHE_MAX_ENTRIES", "256"))
+
+RecommendationKey = Tuple[Hashable, ...]
+
+
+class RecommendationCache:
+    """
+    In-memory cache of recommendation results keyed by (holder, data version, prompt version, model).
+    Concurrent requests for the same key share one in-flight computation (single-flight), results
+    carrying an "error" are never cached, and storing a result drops the holder's older versions.
+    A result for an older data version that finishes after a newer one is returned but not cached.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_entries: int = _RECOMMENDATION_CACHE_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._results: "OrderedDict[RecommendationKey, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[RecommendationKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key: RecommendationKey, compute: Callable[[], Awaitable[Dict[str, Any]]], refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the cached result for key, or run compute once for all concurrent callers.
+        :param key: (RecommendationKey): Holder name first, its data version second, then whatever else identifies the result.
+        :param compute: (Callable): Coroutine function producing the result.
+        :param refresh: (bool): Ignore a cached result and recompute; still joins a computation already in flight.
+        :return: (Dict[str, Any]): The recommendation result.
+        """
+        if not refresh and key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return self._results[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            # shield so a cancelled follower doesn't cancel the leader's computation
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            # mark retrieved so an exception nobody else waited on isn't reported as unhandled
+            future.exception()
+            raise
+        else:
+            if "error" not in result:
+                self._store(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: RecommendationKey, result: Dict[str, Any]) -> None:
+        holder, version = key[0], key[1]
+        same_holder = [cached for cached in self._results if cached[0] == holder and cached != key]
+        if any(cached[1] > version for cached in same_holder):
+            # a slower request for an older version mustn't evict (or sit next to) the newer result
+            return
+        for stale in same_holder:
+            del self._results[stale]
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def invalidate(self, holder: Optional[Hashable] = None) -> None:
+        if holder is None:
+            self._results.clear()
+            return
+        for key in [cached for cached in self._results if cached[0] == holder]:
+            del self._results[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._results),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
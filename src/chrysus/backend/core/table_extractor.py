@@ -1,6 +1,23 @@
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Coroutine, Dict, List, TypeVar
+
+T = TypeVar("T")
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from sync code, so extractors only implement each step once (async).
+    Called from a thread that is already running an event loop, it runs on a fresh loop in a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
 
 
 class TableExtractor(ABC):
@@ -40,3 +57,10 @@ class TableExtractor(ABC):
             NotImplementedError: Must be implemented by concrete subclasses.
         """
         pass
+
+    async def aextract(self, pdf_path: Path) -> List[Dict[str, List[List]]]:
+        """
+        Async variant of extract. The default runs extract on the default executor; extractors that
+        make network calls should override it with a native async implementation.
+        """
+        return await asyncio.to_thread(self.extract, pdf_path)
@@ -0,0 +1,130 @@
+import json
+import base64
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+
+class DateIndex:
+    """
+    Positions of a table's rows ordered by date, undated rows last, with the sorted dates alongside
+    so a date range resolves to a slice with two binary searches. Tables kept by TransactionStore
+    are already date-sorted, in which case no reordering is stored.
+    """
+
+    def __init__(self, dates: pd.Series):
+        values = pd.to_datetime(dates, errors="coerce").to_numpy(dtype="datetime64[ns]")
+        valid = ~np.isnat(values)
+        self.dated = int(valid.sum())
+        # sorted iff the dated rows come first and are non-decreasing
+        if valid[:self.dated].all() and (self.dated < 2 or (np.diff(values[:self.dated]) >= np.timedelta64(0)).all()):
+            self.order: Optional[np.ndarray] = None
+            self.sorted_dates = values
+        else:
+            # numpy sorts NaT last
+            self.order = np.argsort(values, kind="stable")
+            self.sorted_dates = values[self.order]
+        self.size = len(values)
+
+    def span(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> Tuple[int, int]:
+        """
+        Bounds in date order of the rows with start <= date < end. Without either bound undated rows are included.
+        """
+        if start is None and end is None:
+            return 0, self.size
+        dated = self.sorted_dates[:self.dated]
+        low = int(np.searchsorted(dated, start.to_datetime64(), side="left")) if start is not None else 0
+        high = int(np.searchsorted(dated, end.to_datetime64(), side="left")) if end is not None else self.dated
+        return low, max(low, high)
+
+    def positions(self, low: int, high: int, descending: bool = False) -> np.ndarray:
+        """
+        Row positions of the span in date order; descending keeps undated rows last.
+        """
+        positions = np.arange(low, high) if self.order is None else self.order[low:high]
+        if not descending:
+            return positions
+        split = max(0, min(high, self.dated) - low)
+        return np.concatenate([positions[:split][::-1], positions[split:]])
+
+
+def parse_date_bound(value: Optional[str], inclusive_end: bool = False) -> Optional[pd.Timestamp]:
+    """
+    Parse a date query parameter. An end bound given as a bare date covers that whole day.
+    :raises ValueError: If the value isn't a date.
+    """
+    if not value:
+        return None
+    bound = pd.Timestamp(value)
+    if pd.isna(bound):
+        raise ValueError(f"Invalid date: {value}")
+    if inclusive_end and bound == bound.normalize():
+        bound += pd.Timedelta(days=1)
+    return bound.tz_localize(None) if bound.tzinfo is not None else bound
+
+
+def encode_cursor(offset: int, version: int) -> str:
+    payload = json.dumps({"offset": offset, "version": version}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    :return: (Tuple[int, int]): The offset and data version the cursor was issued for.
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset, version = int(payload["offset"]), int(payload["version"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset, version
+
+
+def query_transactions(
+    table: pd.DataFrame,
+    date_index: DateIndex,
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+    tags: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+    sort: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Select transactions by date range and tag, sort, page and project them.
+    Ordered by date (the default, or sort="date"/"-date") and without a tag filter, only the rows of the
+    requested page are ever materialized; otherwise the filter and sort run on the date range slice only.
+    :param sort: (str): A column name, prefixed with "-" for descending. Defaults to ascending date.
+    :param offset: (int): Rows of the result to skip.
+    :param limit: (int): Maximum rows to return, None for all.
+    :return: (Tuple[pd.DataFrame, int]): The page and the number of rows matching the filters.
+    :raises ValueError: On unknown columns.
+    """
+    descending = bool(sort) and sort.startswith("-")
+    sort_column = sort.lstrip("-") if sort else "date"
+    unknown = [column for column in [*(columns or []), sort_column] if column not in table.columns]
+    if tags and "tag" not in table.columns:
+        unknown.append("tag")
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+    low, high = date_index.span(start, end)
+    stop = None if limit is None else offset + limit
+
+    if not tags and sort_column == "date":
+        positions = date_index.positions(low, high, descending)
+        page = table.iloc[positions[offset:stop]]
+        return (page[columns] if columns else page), len(positions)
+
+    needed = list(dict.fromkeys([*(columns or table.columns), sort_column, *(["tag"] if tags else [])]))
+    frame = table[needed].iloc[date_index.positions(low, high, descending and sort_column == "date")]
+    if tags:
+        frame = frame[frame["tag"].isin(tags)]
+    if sort_column != "date":
+        frame = frame.sort_values(sort_column, ascending=not descending, kind="mergesort", na_position="last")
+    page = frame.iloc[offset:stop]
+    return page[columns or list(table.columns)], len(frame)
@@ -0,0 +1,132 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Set
+
+
+_MIX_MULTIPLIER = np.uint64(0x100000001B3)
+
+
+def _column_key(column: str) -> np.uint64:
+    return np.uint64(int.from_bytes(hashlib.blake2b(str(column).encode("utf-8"), digest_size=8).digest(), "little"))
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer, so keyed cell hashes don't combine linearly
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+# infer_dtype kinds of object columns that hold only numbers
+_NUMERIC_OBJECT_KINDS = {"integer", "floating", "mixed-integer-float"}
+
+
+def _hashable_values(values: pd.Series) -> pd.Series:
+    # numbers hash by value, so 3, 3.0 and an int64 or object column holding them fingerprint the same
+    if values.dtype == object:
+        if pd.api.types.infer_dtype(values, skipna=True) in _NUMERIC_OBJECT_KINDS:
+            return pd.to_numeric(values, errors="coerce").astype("float64")
+        return values
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype("float64")
+    return values
+
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash every row of a DataFrame to a uint64 fingerprint.
+    Each cell hash is mixed with a key derived from its column name, and the cells are folded in
+    column name order with an order dependent combine, so the same value in another column (e.g. a
+    debit that appears as a credit) gives a different fingerprint. Numbers are hashed as floats, so the
+    same amount fingerprints the same whether it was extracted as an int, a float or an object column.
+    Null cells are skipped, so a row hashes the same whether a column is missing from its table or
+    present and empty, which matches how pd.concat fills missing columns with NA.
+    :param df: (pd.DataFrame): The rows to fingerprint.
+    :return: (np.ndarray): One uint64 per row.
+    """
+    fingerprints = np.zeros(len(df), dtype=np.uint64)
+    for column in sorted(df.columns, key=str):
+        values = df[column]
+        hashes = pd.util.hash_pandas_object(_hashable_values(values), index=False).to_numpy(copy=True)
+        cells = _mix64(hashes ^ _column_key(column))
+        folded = (fingerprints * _MIX_MULTIPLIER) ^ cells
+        fingerprints = np.where(values.isna().to_numpy(), fingerprints, folded)
+    return fingerprints
+
+
+class TransactionStore:
+    """
+    Append-only, date-sorted store of a holder's transactions.
+    Keeps a fingerprint set of every row so dedup of a new statement is a set lookup per row instead
+    of re-hashing the history, and places the (sorted) new rows with a binary search instead of
+    re-sorting it. The merged table is still materialized as one new DataFrame, so each append
+    copies the history once: linear in the history, not quadratic in a statement's merge.
+    """
+
+    def __init__(self, table: pd.DataFrame, date_col: str = "date"):
+        self.date_col = date_col
+        fingerprints = row_fingerprints(table)
+        first_seen = ~pd.Series(fingerprints).duplicated().to_numpy()
+        self._fingerprints: Set[int] = set(fingerprints[first_seen].tolist())
+        self.table = self._sort(table[first_seen]).reset_index(drop=True)
+
+    def copy(self) -> "TransactionStore":
+        """
+        A store that can be appended to without affecting this one. The table is shared, append replaces it rather than modifying it.
+        """
+        copied = TransactionStore.__new__(TransactionStore)
+        copied.date_col = self.date_col
+        copied._fingerprints = set(self._fingerprints)
+        copied.table = self.table
+        return copied
+
+    def _sort(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.date_col not in df.columns:
+            return df
+        return df.sort_values(by=self.date_col, ascending=True, na_position="last", kind="mergesort")
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def append(self, new_table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add the rows of new_table that aren't already stored, keeping the table sorted by date.
+        :param new_table: (pd.DataFrame): Rows from a newly ingested statement.
+        :return: (pd.DataFrame): The rows that were actually added.
+        """
+        fingerprints = row_fingerprints(new_table)
+        first_seen = ~pd.Series(fingerprints).duplicated().to_numpy()
+        unseen = np.fromiter((fp not in self._fingerprints for fp in fingerprints.tolist()), dtype=bool, count=len(fingerprints))
+        keep = first_seen & unseen
+        added = self._sort(new_table[keep]).reset_index(drop=True)
+        if added.empty:
+            return added
+        self._fingerprints.update(fingerprints[keep].tolist())
+        self.table = self._merge_sorted(self.table, added)
+        return added
+
+    def _merge_sorted(self, existing: pd.DataFrame, added: pd.DataFrame) -> pd.DataFrame:
+        combined = pd.concat([existing, added], ignore_index=True)
+        if self.date_col not in combined.columns or not pd.api.types.is_datetime64_dtype(combined[self.date_col]):
+            return self._sort(combined).reset_index(drop=True)
+        if self.date_col not in existing.columns or self.date_col not in added.columns:
+            return self._sort(combined).reset_index(drop=True)
+
+        existing_dates = existing[self.date_col].to_numpy()
+        added_dates = added[self.date_col].to_numpy()
+        existing_valid = int((~np.isnat(existing_dates)).sum())
+        added_nat = np.isnat(added_dates)
+        # new rows go after existing rows with the same date (stable), undated rows go last
+        positions = np.where(
+            added_nat,
+            len(existing),
+            np.searchsorted(existing_dates[:existing_valid], added_dates, side="right"),
+        )
+        targets = positions + np.arange(len(added))
+        order = np.empty(len(combined), dtype=np.int64)
+        is_existing_slot = np.ones(len(combined), dtype=bool)
+        is_existing_slot[targets] = False
+        order[targets] = len(existing) + np.arange(len(added))
+        order[is_existing_slot] = np.arange(len(existing))
+        return combined.take(order).reset_index(drop=True)
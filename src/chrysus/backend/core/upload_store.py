@@ -0,0 +1,58 @@
+import os
+import uuid
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Any, Optional, Tuple
+from chrysus import resolve_component_dirs_path
+from chrysus.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+async def store_upload(upload: Any, dest_dir: Optional[Path] = None, max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[Path, str, int, bool]:
+    """
+    Stream an upload to disk under its content hash. The file is read in chunks without blocking
+    the event loop, hashed while streaming, written to a unique temp file and atomically renamed
+    to <sha256>.pdf, so concurrent uploads never clobber each other.
+    :param upload: (Any): Anything with an async read(size) method, e.g. fastapi's UploadFile.
+    :param dest_dir: (Path | None): Where to store the file, defaults to data/uploads.
+    :param max_bytes: (int): Reject uploads larger than this.
+    :return: (Tuple[Path, str, int, bool]): The stored path, its sha256, its size and whether the
+        same content had already been stored.
+    :raises: UploadTooLargeError: If the upload exceeds max_bytes.
+    """
+    dest_dir = dest_dir if dest_dir is not None else resolve_component_dirs_path("data") / "uploads"
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest_dir / f".{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as buffer:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+                digest.update(chunk)
+                await asyncio.to_thread(buffer.write, chunk)
+        content_digest = digest.hexdigest()
+        final_path = dest_dir / f"{content_digest}.pdf"
+        if final_path.exists():
+            tmp_path.unlink(missing_ok=True)
+            return final_path, content_digest, size, True
+        os.replace(tmp_path, final_path)
+        return final_path, content_digest, size, False
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
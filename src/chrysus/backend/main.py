@@ -1,19 +1,68 @@
 import os
-import shutil
 import asyncio
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pathlib import Path
 
 from chrysus.backend.core.accounts_controller import AccountsController
+from chrysus.backend.core.layout_extractor import LayoutExtractor
+from chrysus.backend.core.job_queue import IngestionQueue, ProgressCallback, JOB_SUCCEEDED
+from chrysus.backend.core.upload_store import store_upload, UploadTooLargeError
+from chrysus.backend.core.recommendation_cache import RecommendationCache
+from chrysus.backend.core.account_holder import AccountHolder
+from chrysus.backend.core.json_response import dumps, etag_matches, make_etag
+from chrysus.backend.core.transaction_query import parse_date_bound, encode_cursor, decode_cursor
+from chrysus.backend.core.arrow_export import EXPORT_FORMATS, MEDIA_TYPES
+from chrysus.backend.core.holder_storage import HolderStorage
+from chrysus.backend.core.ingestion_pool import IngestionProcessPool, INGESTION_MODE
+from chrysus.backend.core.prewarm import Prewarmer
+from chrysus.backend.core.llm_gateway import gateway_metrics
 from chrysus.utils.logger import get_logger
-from chrysus import resolve_component_dirs_path
 from fastapi.middleware.cors import CORSMiddleware
 
 logger = get_logger(__name__)
 
+_TRANSACTION_PAGE_MAX_LIMIT = int(os.environ.get("TRANSACTION_PAGE_MAX_LIMIT", "5000"))
+
 app = FastAPI()
-accounts_controller = AccountsController()
+ingestion_pool = IngestionProcessPool() if INGESTION_MODE == "process" else None
+accounts_controller = AccountsController(
+    table_extractor=LayoutExtractor(),
+    storage=None if os.environ.get("DISABLE_HOLDER_STORAGE", "false").lower() == "true" else HolderStorage(),
+    ingestion_pool=ingestion_pool,
+)
+
+
+async def run_ingestion_job(job: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    holder_name = await accounts_controller.aextract_tables_from_pdf_and_add_to_self(Path(job["pdf_path"]), progress)
+    if holder_name is None:
+        raise ValueError(f"Found no account holder name in {job['filename'] or job['pdf_path']}")
+    logger.info(f"Extracted tables from {job['filename']} for {holder_name}")
+    return {"holder": holder_name}
+
+
+ingestion_queue = IngestionQueue(run_ingestion_job)
+recommendation_cache = RecommendationCache()
+prewarmer = Prewarmer(ingestion_pool=ingestion_pool)
+
+
+@app.on_event("startup")
+async def start_ingestion_queue():
+    # metadata only, tables are read on first access; restored before resumed jobs can add to the holders
+    accounts_controller.load_from_storage()
+    if ingestion_pool is not None:
+        ingestion_pool.start()
+    prewarmer.start()
+    await ingestion_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_ingestion_queue():
+    await ingestion_queue.stop()
+    if ingestion_pool is not None:
+        ingestion_pool.shutdown()
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,26 +72,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """
+    Ready once the prewarm steps finished (immediately when PREWARM_MODELS is off), 503 until then.
+    """
+    status = prewarmer.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/metrics/llm")
+def get_llm_metrics():
+    return {"models": gateway_metrics()}
+
+
 @app.post("/upload_pdf/")
-async def upload_pdf(file: UploadFile = File(...)):
+async def upload_pdf(file: UploadFile = File(...), priority: int = 0):
     filename = os.path.basename(file.filename)
-    data_dir = resolve_component_dirs_path("data")
-    save_path = data_dir / filename
-    with open(save_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
     try:
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            None,  
-            accounts_controller.extract_tables_from_pdf_and_add_to_self,
-            save_path,
+        save_path, digest, size, _ = await store_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    existing = ingestion_queue.store.find_by_digest(digest)
+    # a succeeded job only blocks the upload while its tables are still held, jobs.sqlite outlives in-memory holders
+    if existing is not None and (existing["status"] != JOB_SUCCEEDED or accounts_controller.holds_job_data(existing)):
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"{filename} was already uploaded", "job_id": existing["id"], "status": existing["status"]},
         )
-        logger.info(f"Extracted tables from {filename}")
-        logger.info(f"Account holder map: {accounts_controller.account_holder_map}")
-    except Exception as e:
-        logger.error(f"Extraction error: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"success": True}
+    logger.info(f"Stored upload {filename} ({size} bytes) as {save_path.name}")
+    job = ingestion_queue.submit(save_path, filename=filename, priority=priority, digest=digest)
+    return {"success": True, "job_id": job["id"], "status": job["status"]}
+
+
+@app.get("/jobs")
+def get_jobs(status: Optional[str] = None, limit: int = 100):
+    return {"jobs": ingestion_queue.store.list(status=status, limit=limit)}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = ingestion_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 # @app.post("/upload_pdf/")
 # async def upload_pdf(file: UploadFile = File(...)):
@@ -61,53 +139,144 @@ async def upload_pdf(file: UploadFile = File(...)):
 
 @app.get("/users")
 def get_users():
-    logger.info(f"Account holder map: {accounts_controller.account_holder_map}")
-    res_packet = {"users": list(accounts_controller.account_holder_map.keys())}
+    res_packet = {"users": accounts_controller.holder_names()}
     logger.info(f"Users packet: {res_packet}")
     return res_packet
 
+def serialized_view_response(request: Request, holder: AccountHolder, view: str) -> Response:
+    """
+    Serve a holder's pre-serialized view with a strong ETag, answering 304 when If-None-Match matches.
+    A match against the current version's tag is answered before any serialization.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    etag = holder.get_serialized_etag(view)
+    if etag is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    body, etag = holder.get_serialized(view)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/user/{name}/base_insights")
-def get_base_insights(name: str):
+def get_base_insights(name: str, request: Request):
     holder = accounts_controller.get_account_holder(name)
     if not holder:
         raise HTTPException(status_code=404, detail="Account holder not found")
-    packet = holder.get_base_insights()
-    logger.info(f"Base insights: {packet}")
-    return packet
+    return serialized_view_response(request, holder, "base_insights")
 
 @app.get("/user/{name}/transaction_table")
-def get_transaction_table(name: str):
+def get_transaction_table(
+    name: str,
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None),
+    columns: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=_TRANSACTION_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    """
+    The holder's transactions. Without query parameters the whole table is served from the
+    pre-serialized view. start/end (inclusive dates), tag (repeatable), columns (comma separated)
+    and sort (column, "-" prefix for descending) filter and shape the rows, which then come in an
+    envelope with the total, the data version and, with limit or cursor, a next_cursor for the
+    following page. The envelope is serialized with orjson and carries an ETag like the full view.
+    """
     holder = accounts_controller.get_account_holder(name)
     if not holder:
         raise HTTPException(status_code=404, detail="Account holder not found")
     
-    transaction_table = holder.get_transaction_table_json()
-    if transaction_table is None:
+    if holder.transaction_table is None:
         raise HTTPException(status_code=404, detail="No transaction table found for this user")
     
-    return transaction_table
+    if all(param is None for param in (start, end, tag, columns, sort, limit, cursor)):
+        return serialized_view_response(request, holder, "transaction_table")
+
+    offset = 0
+    if cursor is not None:
+        try:
+            offset, cursor_version = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        rows, total, version = holder.query_transaction_table(
+            start=parse_date_bound(start),
+            end=parse_date_bound(end, inclusive_end=True),
+            tags=tag,
+            columns=[column.strip() for column in columns.split(",") if column.strip()] if columns else None,
+            sort=sort,
+            offset=offset,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if cursor is not None and cursor_version != version:
+        raise HTTPException(status_code=410, detail="The transaction table changed since this cursor was issued, restart from the first page")
+
+    next_offset = offset + len(rows)
+    body = dumps({
+        "rows": rows,
+        "total": total,
+        "next_cursor": encode_cursor(next_offset, version) if limit is not None and next_offset < total else None,
+        "version": version,
+    })
+    headers = {"ETag": make_etag(body), "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/user/{name}/transaction_table/export")
+def export_transaction_table(name: str, format: str = "arrow"):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    holder = accounts_controller.get_account_holder(name)
+    if not holder:
+        raise HTTPException(status_code=404, detail="Account holder not found")
+    if holder.transaction_table is None:
+        raise HTTPException(status_code=404, detail="No transaction table found for this user")
+    extension = "arrows" if format == "arrow" else "parquet"
+    return StreamingResponse(
+        holder.export_transaction_table(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{extension}"'},
+    )
+
+@app.get("/export/transaction_tables")
+def export_transaction_tables(format: str = "parquet"):
+    """
+    Every holder's transactions as one dataset partitioned by holder: a zip of a hive-partitioned
+    Parquet dataset, or a single Arrow IPC stream with a holder column.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    media_type, filename = (MEDIA_TYPES["zip"], "transactions.zip") if format == "parquet" else (MEDIA_TYPES["arrow"], "transactions.arrows")
+    return StreamingResponse(
+        accounts_controller.export_transaction_tables(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @app.get("/user/{name}/descriptive_tables")
-def get_descriptive_tables(name: str):
+def get_descriptive_tables(name: str, request: Request):
     holder = accounts_controller.get_account_holder(name)
     if not holder:
         raise HTTPException(status_code=404, detail="Account holder not found")
-    
-    descriptive_tables = holder.get_descriptive_tables_json()
-    logger.info(f"Descriptive tables: {descriptive_tables}")
-    return descriptive_tables
+    return serialized_view_response(request, holder, "descriptive_tables")
 
 @app.get("/user/{name}/recommendations")
-async def get_recommendations(name: str):
+async def get_recommendations(name: str, refresh: bool = False):
     holder = accounts_controller.get_account_holder(name)
     if not holder:
         raise HTTPException(status_code=404, detail="Account holder not found")
     
     try:
         loop = asyncio.get_running_loop()
-        recommendations = await loop.run_in_executor(
-            None,
-            holder.get_recommendations
+        recommendations = await recommendation_cache.get_or_compute(
+            holder.recommendation_cache_key(),
+            lambda: loop.run_in_executor(None, holder.get_recommendations),
+            refresh=refresh,
         )
         if "error" in recommendations:
             raise HTTPException(status_code=500, detail=recommendations["error"])
@@ -0,0 +1,81 @@
+"""
+Rows/sec of the transaction classifier: the original fp16 pipeline against the pluggable backends,
+single table and with several tables classifying concurrently through the dynamic batcher.
+
+    python -m chrysus.benchmarks.classifier_benchmark --rows 2000 --tables 4
+"""
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+from chrysus.backend.core.informed_table import _MODEL_NAME
+from chrysus.backend.core.classifier_backend import DynamicBatcher, build_classifier_backend
+
+
+_MERCHANTS = [
+    "NETFLIX.COM", "SHELL OIL", "AMAZON MKTPLACE PMTS", "STARBUCKS STORE", "UBER TRIP", "PAYROLL DEPOSIT ACME CORP",
+    "CHASE CREDIT CRD AUTOPAY", "RENT PAYMENT ONLINE TRANSFER", "WALGREENS", "COMCAST CABLE", "NSF RETURNED ITEM FEE",
+    "ZELLE PAYMENT TO JOHN", "WHOLE FOODS MARKET", "PLANET FITNESS CLUB FEES", "SBA LOAN PAYMENT",
+]
+
+
+def synthetic_descriptions(rows: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(_MERCHANTS)} {rng.randint(100, 9999)} {rng.choice(['', 'POS PURCHASE', 'REF ' + str(rng.randint(10**6, 10**7))])}".strip() for _ in range(rows)]
+
+
+def baseline_classify() -> Callable[[List[str]], List[str]]:
+    """The classifier exactly as InformedTable configured it before the backend split."""
+    import torch
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+
+    pipe = pipeline(
+        task="text-classification",
+        model=AutoModelForSequenceClassification.from_pretrained(_MODEL_NAME, torch_dtype=torch.float16, device_map="auto"),
+        tokenizer=AutoTokenizer.from_pretrained(_MODEL_NAME),
+        batch_size=64,
+        truncation=True,
+    )
+    return lambda texts: [p["label"] for p in pipe(texts)]
+
+
+def measure(name: str, classify: Callable[[List[str]], List[str]], tables: List[List[str]], concurrent: bool) -> None:
+    classify(tables[0][:8])  # warm up
+    start = time.perf_counter()
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+            list(executor.map(classify, tables))
+    else:
+        for table in tables:
+            classify(table)
+    elapsed = time.perf_counter() - start
+    rows = sum(len(table) for table in tables)
+    print(f"{name:<40} {rows:>8} rows {elapsed:>8.2f}s {rows / elapsed:>10.1f} rows/sec")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--rows", type=int, default=2000, help="rows per table")
+    arg_parser.add_argument("--tables", type=int, default=4, help="tables classified concurrently")
+    arg_parser.add_argument("--backends", default="baseline,hf,onnx")
+    arg_parser.add_argument("--threads", type=int, default=0, help="intra-op threads for the backends, 0 for the default")
+    args = arg_parser.parse_args()
+
+    tables = [synthetic_descriptions(args.rows, seed=i) for i in range(args.tables)]
+    for backend in args.backends.split(","):
+        try:
+            if backend == "baseline":
+                classify = baseline_classify()
+                measure("baseline fp16 pipeline (sequential)", classify, tables, concurrent=False)
+                measure("baseline fp16 pipeline (concurrent)", classify, tables, concurrent=True)
+                continue
+            batcher = DynamicBatcher(build_classifier_backend(_MODEL_NAME, backend=backend, num_threads=args.threads))
+            measure(f"{backend} + dynamic batcher (sequential)", batcher.classify, tables, concurrent=False)
+            measure(f"{backend} + dynamic batcher (concurrent)", batcher.classify, tables, concurrent=True)
+        except Exception as e:
+            print(f"{backend:<40} failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Cold import time of the API module, in fresh interpreters without a GOOGLE_API_KEY. Fails (exit
+code 1) when the best run is slower than --max-seconds or when a dependency that should only load
+on first use (transformers, torch, pdfplumber, pytesseract, LangChain) was imported.
+
+    python -m chrysus.benchmarks.import_time_benchmark --max-seconds 2.0
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+# top-level packages that importing chrysus.backend.main must not pull in
+DEFERRED_MODULES = (
+    "transformers",
+    "torch",
+    "pdfplumber",
+    "pytesseract",
+    "langchain",
+    "langchain_core",
+    "langchain_google_genai",
+)
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted({{name.split(".")[0] for name in sys.modules}})}}))
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.pop("GOOGLE_API_KEY", None)
+    return env
+
+
+def run_once(module: str) -> Tuple[float, List[str]]:
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        capture_output=True, text=True, env=_child_env(), check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report["seconds"], report["modules"]
+
+
+def slowest_imports(module: str, top: int) -> List[Tuple[int, str]]:
+    """
+    The imports with the largest cumulative time (microseconds) from `python -X importtime`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_child_env(), check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings.append((int(cumulative), name.strip()))
+    return sorted(timings, reverse=True)[:top]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--module", default="chrysus.backend.main")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--max-seconds", type=float, default=float(os.environ.get("IMPORT_TIME_MAX_SECONDS", "2.0")))
+    arg_parser.add_argument("--top", type=int, default=15)
+    args = arg_parser.parse_args()
+
+    timings = []
+    loaded: List[str] = []
+    for _ in range(args.repeat):
+        seconds, loaded = run_once(args.module)
+        timings.append(seconds)
+    best = min(timings)
+    print(f"import {args.module}: best {best:.3f}s, worst {max(timings):.3f}s over {args.repeat} runs")
+
+    print(f"\n{'cumulative':>12}  module")
+    for cumulative, name in slowest_imports(args.module, args.top):
+        print(f"{cumulative / 1e6:>11.3f}s  {name}")
+
+    failed = False
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    if eager:
+        print(f"\nFAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if best > args.max_seconds:
+        print(f"\nFAIL: {best:.3f}s is over the {args.max_seconds:.3f}s budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,26 @@ import { useUser } from "@/contexts/UserContext";
 import { toast } from "@/hooks/use-toast";
 import { buildApiUrl } from "@/lib/config";
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// Uploads are processed by a background job; wait for it to finish before refreshing users.
+const waitForJob = async (jobId: string): Promise<void> => {
+  for (;;) {
+    const response = await fetch(buildApiUrl(`jobs/${jobId}`));
+    if (!response.ok) {
+      throw new Error("Failed to fetch job status");
+    }
+    const job = await response.json();
+    if (job.status === "succeeded") {
+      return;
+    }
+    if (job.status === "failed") {
+      throw new Error(job.error || "Processing failed");
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
 export const PdfUpload = () => {
   const [uploading, setUploading] = useState(false);
   const [dragOver, setDragOver] = useState(false);
@@ -23,7 +43,15 @@ export const PdfUpload = () => {
         body: formData,
       });
 
-      if (response.ok) {
+      if (response.status === 409) {
+        toast({
+          title: "Already uploaded",
+          description: `${file.name} has already been uploaded.`,
+        });
+      } else if (response.ok) {
+        const { job_id } = await response.json();
+        await waitForJob(job_id);
+
         toast({
           title: "Upload successful",
           description: `${file.name} has been processed successfully.`,
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from chrysus.backend.core.arrow_export import frame_to_arrow, arrow_to_frame, iter_bulk_export
+from chrysus.backend.core.transaction_store import row_fingerprints
+
+
+def _statement() -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-05", "2024-01-06", "2024-01-07"]),
+        "description": ["RENT", "SALARY", None],
+        "debit": pd.Series([1200.5, None, 3], dtype=object),
+        "credit": pd.Series([None, 2500, None], dtype=object),
+        "reference": pd.Series(["A1", 17, None], dtype=object),
+        "balance": [800.0, 3300.0, np.nan],
+        "tag": pd.Series(["x", None, "z"], dtype="string"),
+    })
+
+
+def test_numeric_object_columns_stay_numeric():
+    table = frame_to_arrow(_statement())
+    assert pa.types.is_floating(table.schema.field("debit").type)
+    assert pa.types.is_integer(table.schema.field("credit").type)
+    restored = arrow_to_frame(table)
+    assert restored["debit"].tolist() == [1200.5, None, 3.0]
+    assert restored["credit"].tolist() == [None, 2500, None]
+
+
+def test_round_trip_keeps_dtypes_and_fingerprints():
+    df = _statement()
+    restored = arrow_to_frame(frame_to_arrow(df))
+    assert restored.dtypes.to_dict() == df.dtypes.to_dict()
+    assert (row_fingerprints(restored) == row_fingerprints(df)).all()
+    # only truly mixed columns are stringified
+    assert restored["reference"].tolist() == ["A1", "17", None]
+
+
+def test_bulk_export_falls_back_to_string_for_conflicting_columns():
+    holders = [
+        ("ann", pd.DataFrame({"date": pd.to_datetime(["2024-01-05"]), "transaction_amount": [-900.5], "count": [1]})),
+        ("bob", pd.DataFrame({"date": pd.to_datetime(["2024-01-06"]), "transaction_amount": ["-12.00"], "count": [2.5], "memo": ["x"]})),
+    ]
+    table = pa.ipc.open_stream(b"".join(iter_bulk_export(holders, "arrow"))).read_all()
+    assert table.schema.field("transaction_amount").type == pa.string()
+    assert table.schema.field("count").type == pa.float64()
+    assert table.column("transaction_amount").to_pylist() == ["-900.5", "-12.00"]
+    assert table.column("memo").to_pylist() == [None, "x"]
+    assert table.column("holder").to_pylist() == ["ann", "bob"]
@@ -0,0 +1,40 @@
+import pandas as pd
+from chrysus.backend.core.accounts_controller import AccountsController
+from chrysus.backend.core.holder_storage import HolderStorage
+from chrysus.backend.core.informed_table import InformedTable
+from chrysus.backend.core.job_queue import JobStore, JOB_SUCCEEDED
+
+
+def _ingest(controller: AccountsController, jobs: JobStore, pdf_path: str) -> dict:
+    job = jobs.create(pdf_path, filename="statement.pdf", digest="abc")
+    table = InformedTable(pd.DataFrame({"balance": [10.0]}), {"name": "ann"}, pdf_path, preprocess=False)
+    holder = controller.merge_built_tables([table], pdf_path)
+    jobs.update(job["id"], status=JOB_SUCCEEDED, result={"holder": holder})
+    return jobs.find_by_digest("abc")
+
+
+def test_ingested_job_is_held_until_a_restart_drops_the_holder(tmp_path):
+    jobs = JobStore(tmp_path / "jobs.sqlite")
+    pdf_path = str(tmp_path / "abc.pdf")
+    controller = AccountsController()
+    job = _ingest(controller, jobs, pdf_path)
+    assert controller.holds_job_data(job)
+    # jobs.sqlite survives the restart, the in-memory holder doesn't
+    restarted = AccountsController()
+    assert jobs.find_by_digest("abc")["id"] == job["id"]
+    assert not restarted.holds_job_data(job)
+
+
+def test_ingested_job_is_held_while_its_stored_tables_are(tmp_path):
+    jobs = JobStore(tmp_path / "jobs.sqlite")
+    pdf_path = str(tmp_path / "abc.pdf")
+    job = _ingest(AccountsController(storage=HolderStorage(tmp_path / "holders")), jobs, pdf_path)
+    assert AccountsController().holds_job_data(job) is False
+
+    restarted = AccountsController(storage=HolderStorage(tmp_path / "holders"))
+    restarted.load_from_storage()
+    assert restarted.holds_job_data(job)
+
+    for parquet in (tmp_path / "holders").rglob("*.parquet"):
+        parquet.unlink()
+    assert not restarted.holds_job_data(job)
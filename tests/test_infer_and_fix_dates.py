@@ -0,0 +1,56 @@
+import re
+from datetime import datetime
+import pandas as pd
+import pytest
+from dateutil import parser
+from chrysus.backend.core.informed_table import infer_and_fix_dates
+
+
+def baseline_infer_and_fix_dates(df: pd.DataFrame, date_col: str = "date") -> pd.Series:
+    # the per-row implementation infer_and_fix_dates replaced
+    fixed_dates = []
+    last_full_date = None
+    inferred_year = None
+    for raw_date in df[date_col]:
+        date_str = str(raw_date).strip()
+        try:
+            dt = parser.parse(date_str, fuzzy=True, default=None)
+            if dt.year == 1900 and inferred_year:
+                dt = dt.replace(year=inferred_year)
+        except Exception:
+            dt = None
+        if dt is None:
+            m = re.match(r"([A-Za-z]+)\s+(\d{1,2})", date_str)
+            if m and last_full_date is not None:
+                month_name, day = m.groups()
+                try:
+                    dt = parser.parse(f"{month_name} {day} {last_full_date.year}")
+                except Exception:
+                    dt = None
+            elif last_full_date is not None:
+                dt = last_full_date
+        if dt is not None:
+            last_full_date = dt
+            inferred_year = dt.year
+        fixed_dates.append(dt)
+    return pd.Series(fixed_dates, index=df.index)
+
+
+@pytest.mark.parametrize("dates", [
+    ["2024-01-05", "2024-01-06", "2024-02-01"],
+    ["01/05/2024", "01/17/2024", "02/01/24"],
+    ["Jan 5, 2024", "January 17, 2024", "5 Feb 2024"],
+    ["12/30/2023", "Jan 2", "Jan 3"],
+    ["Feb 2", "Mar 15", "Dec 31"],
+    ["2023-12-30", "Balance forward", "Jan 2", "n/a", "2024-01-04"],
+    ["Opening balance", "2024-03-01", "", "Mar 2"],
+])
+def test_matches_the_baseline(dates):
+    df = pd.DataFrame({"date": dates})
+    expected = pd.to_datetime(baseline_infer_and_fix_dates(df))
+    assert infer_and_fix_dates(df).equals(expected)
+
+
+def test_partial_dates_after_a_year_boundary_stay_in_the_current_year():
+    fixed = infer_and_fix_dates(pd.DataFrame({"date": ["12/30/2023", "Jan 2", "Jan 3"]}))
+    assert fixed.tolist() == [pd.Timestamp(2023, 12, 30), pd.Timestamp(datetime.now().year, 1, 2), pd.Timestamp(datetime.now().year, 1, 3)]
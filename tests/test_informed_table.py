@@ -0,0 +1,43 @@
+import pandas as pd
+from chrysus.backend.core.informed_table import InformedTable
+from chrysus.backend.core.transaction_features import TransactionFeatureEngine
+
+
+def transaction_table(rows, pdf_path="statement.pdf") -> InformedTable:
+    table = InformedTable(
+        pd.DataFrame(rows, columns=["date", "description", "tag", "transaction_amount"]).assign(date=lambda df: pd.to_datetime(df["date"])),
+        {"name": "ann"},
+        pdf_path,
+        preprocess=False,
+    )
+    table.is_transaction_table = True
+    return table
+
+
+def test_features_after_append_match_recomputing_when_first_table_had_duplicates():
+    first = transaction_table([
+        ("2024-01-01", "RENT", "housing", -900.0),
+        ("2024-01-01", "RENT", "housing", -900.0),
+        ("2024-01-02", "PAYROLL", "income", 2000.0),
+    ])
+    first.extract_transaction_features()
+    first.append_transactions(transaction_table([("2024-02-01", "RENT", "housing", -900.0)], "second.pdf"))
+
+    assert len(first.table) == 3
+    assert first.insights["transaction_features"] == TransactionFeatureEngine.from_table(first.table).features()
+
+
+def test_appending_to_a_holder_leaves_the_previous_snapshot_untouched():
+    from chrysus.backend.core.account_holder import AccountHolder
+
+    holder = AccountHolder(name="ann")
+    holder.add_table(transaction_table([("2024-01-01", "RENT", "housing", -900.0)]))
+    before = holder.snapshot()
+    features_before = AccountHolder._base_insights(before)
+
+    holder.add_table(transaction_table([("2024-02-01", "PAYROLL", "income", 2000.0)], "second.pdf"))
+
+    assert len(before.transaction_table.table) == 1
+    assert AccountHolder._base_insights(before) == features_before
+    assert before.transaction_table.transaction_features() == TransactionFeatureEngine.from_table(before.transaction_table.table).features()
+    assert len(holder.transaction_table.table) == 2
@@ -0,0 +1,33 @@
+import pandas as pd
+from chrysus.backend.core.informed_table import InformedTable
+from chrysus.backend.core.ingestion_pool import encode_built_table, restore_built_table
+from chrysus.backend.core.transaction_store import row_fingerprints
+
+
+def test_process_mode_table_matches_thread_mode():
+    # thread mode merges the built table itself, process mode the one restored from its encoded payload
+    built = InformedTable(
+        pd.DataFrame({
+            "date": pd.to_datetime(["2024-01-05", "2024-01-06"]),
+            "description": ["RENT", "SALARY"],
+            "debit": pd.Series([1200.5, None], dtype=object),
+            "credit": pd.Series([None, 2500], dtype=object),
+            "reference": pd.Series(["A1", 17], dtype=object),
+            "tag": ["housing", "income"],
+            "transaction_amount": pd.Series([-1200.5, 2500], dtype=object),
+        }),
+        {"name": "ann"},
+        "statement.pdf",
+        preprocess=False,
+    )
+    built.is_transaction_table = True
+    built.extract_transaction_features()
+
+    restored = restore_built_table(encode_built_table(built))
+
+    assert restored.table.dtypes.to_dict() == built.table.dtypes.to_dict()
+    assert restored.table[["debit", "credit", "transaction_amount"]].equals(built.table[["debit", "credit", "transaction_amount"]])
+    assert (row_fingerprints(restored.table) == row_fingerprints(built.table)).all()
+    assert restored.insights == built.insights
+    assert restored.pdf_path == built.pdf_path
+    assert restored.is_transaction_table
@@ -0,0 +1,21 @@
+import json
+import numpy as np
+import pandas as pd
+from chrysus.backend.core.json_response import dataframe_to_records
+
+
+def test_object_columns_are_json_ready():
+    df = pd.DataFrame({
+        "description": ["RENT", None, "SALARY"],
+        "amount": pd.Series([np.float64(-900.5), np.inf, np.int64(2000)], dtype=object),
+        "balance": pd.Series([-np.inf, 1.5, None], dtype=object),
+    })
+    records = dataframe_to_records(df)
+    assert records == [
+        {"description": "RENT", "amount": -900.5, "balance": None},
+        {"description": None, "amount": None, "balance": 1.5},
+        {"description": "SALARY", "amount": 2000, "balance": None},
+    ]
+    assert type(records[2]["amount"]) is int
+    # the standard encoder (and FastAPI's) rejects numpy scalars and, with allow_nan off, infinities
+    json.dumps(records, allow_nan=False)
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from chrysus.backend.core.llm_gateway import GatewayModel, ModelLimiter
+
+
+class _Interrupted:
+    def invoke(self, prompt, **kwargs):
+        raise KeyboardInterrupt
+
+    async def ainvoke(self, prompt, **kwargs):
+        await asyncio.sleep(10)
+
+
+def test_interrupted_invoke_gives_the_slot_back():
+    limiter = ModelLimiter("test", rpm=60, tpm=100000)
+    with pytest.raises(KeyboardInterrupt):
+        GatewayModel(_Interrupted(), limiter).invoke("hello")
+    assert limiter.metrics()["in_flight"] == 0
+
+
+def test_cancelled_ainvoke_gives_the_slot_back():
+    limiter = ModelLimiter("test", rpm=60, tpm=100000)
+
+    async def cancel_call():
+        call = asyncio.ensure_future(GatewayModel(_Interrupted(), limiter).ainvoke("hello"))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(cancel_call())
+    metrics = limiter.metrics()
+    assert metrics["in_flight"] == 0
+    assert metrics["throttled"] == 0
+
+
+def test_set_quota_caps_the_buckets():
+    limiter = ModelLimiter("test", rpm=90, tpm=300000)
+    limiter.set_quota(30, 100000)
+    assert (limiter.metrics()["rpm"], limiter.metrics()["tpm"]) == (30, 100000)
+    for _ in range(30):
+        assert limiter.try_acquire(10) == 0
+        limiter.release(10, None)
+    assert limiter.try_acquire(10) > 0
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from chrysus.backend.core.prompt_builder import build_recommendation_prompt, encode_rows, select_evidence_rows
+
+_TEMPLATE = "Assess the client.\n{base_insights}\n{descriptive_tables}\n{transaction_table}"
+
+
+def _transactions(rows: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(np.arange(rows), unit="D"),
+        "description": rng.choice(["GROCERY STORE 123", "COFFEE SHOP", "GAS STATION 55"], rows),
+        "tag": rng.choice(["food", "fuel"], rows),
+        "transaction_amount": -rng.integers(5, 80, rows).astype(float),
+    })
+    # an old bounced item and an old large flow, both outside the most recent period
+    df.loc[10, ["description", "transaction_amount"]] = ["NSF FEE RETURNED ITEM", -35.0]
+    df.loc[20, ["description", "transaction_amount"]] = ["WIRE FROM ESCROW", 250000.0]
+    return df
+
+
+def test_both_category_columns_get_their_own_key():
+    header, _ = encode_rows(pd.DataFrame({"tag": ["food"], "txn_category": ["groceries"]}))
+    assert len(set(header.split("\t"))) == 2
+
+
+def test_evidence_rows_fit_the_budget_and_keep_nsf_and_largest_flows():
+    df = _transactions()
+    row_tokens = np.full(len(df), 10)
+    selected, codes = select_evidence_rows(df, row_tokens, token_budget=300)
+    assert row_tokens[selected].sum() <= 300
+    assert len(selected) < len(df)
+    assert dict(zip(selected.tolist(), codes.tolist()))[10] == "b"
+    assert dict(zip(selected.tolist(), codes.tolist()))[20] == "l"
+    assert list(selected) == sorted(selected)
+
+
+def test_prompt_is_trimmed_to_the_token_budget():
+    df = _transactions()
+    result = build_recommendation_prompt(_TEMPLATE, {"tags": [{"tag": "food", "sum": -100.0}]}, [], df, token_budget=1500)
+    rows = result["transaction_rows"]
+    assert result["token_counts"]["total"] <= 1500
+    assert 0 < rows["included"] < rows["total"] == len(df)
+    assert rows["selected_by"]["bounced"] == 1
+    assert rows["selected_by"]["largest_flow"] > 0
+    assert "NSF FEE RETURNED ITEM" in result["prompt"]
+    assert "WIRE FROM ESCROW" in result["prompt"]
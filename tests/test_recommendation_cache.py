@@ -0,0 +1,30 @@
+import asyncio
+from chrysus.backend.core.recommendation_cache import RecommendationCache
+
+
+def _compute(result, delay=0.0):
+    async def compute():
+        await asyncio.sleep(delay)
+        return result
+    return compute
+
+
+def test_newer_version_evicts_older():
+    async def run():
+        cache = RecommendationCache()
+        await cache.get_or_compute(("ann", 1, "2", "m"), _compute({"recommendation": "old"}))
+        await cache.get_or_compute(("ann", 2, "2", "m"), _compute({"recommendation": "new"}))
+        return cache
+    cache = asyncio.run(run())
+    assert list(cache._results) == [("ann", 2, "2", "m")]
+
+
+def test_late_older_result_does_not_evict_newer():
+    async def run():
+        cache = RecommendationCache()
+        slow_old = asyncio.create_task(cache.get_or_compute(("ann", 1, "2", "m"), _compute({"recommendation": "old"}, 0.05)))
+        await cache.get_or_compute(("ann", 2, "2", "m"), _compute({"recommendation": "new"}))
+        assert (await slow_old)["recommendation"] == "old"
+        return cache
+    cache = asyncio.run(run())
+    assert list(cache._results) == [("ann", 2, "2", "m")]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from chrysus.backend.core.transaction_features import TransactionFeatureEngine
+
+
+def _large_amount_table(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    amounts = (rng.choice([1, -1], rows) * (rng.integers(100_000, 5_000_000, rows) + rng.integers(0, 3, rows) / 100)).astype(float)
+    amounts[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 400, rows)), unit="D"),
+        "description": rng.choice(["PAYROLL", "RENT", "WIRE", "BROKERAGE"], rows),
+        "tag": rng.choice(["income", "housing", "transfer"], rows),
+        "transaction_amount": amounts,
+    })
+
+
+def _baseline_std(df: pd.DataFrame, key: pd.Series) -> pd.Series:
+    return df.groupby(key)["transaction_amount"].agg(["mean", "max", "min", "sum", "std", "count"])["std"]
+
+
+@pytest.mark.parametrize("batches", [1, 7])
+def test_std_matches_groupby_on_large_amounts(batches):
+    df = _large_amount_table(3000)
+    engine = TransactionFeatureEngine()
+    for part in np.array_split(np.arange(len(df)), batches):
+        engine.update(df.iloc[part])
+    features = engine.features()
+
+    for name, key_name, key in [
+        ("tags", "tag", df["tag"]),
+        ("frequent_descriptions", "description", df["description"]),
+        ("monthly", "month", df["date"].dt.to_period("M").astype(str)),
+        ("weekly", "week", df["date"].dt.to_period("W").astype(str)),
+    ]:
+        expected = _baseline_std(df, key)
+        got = pd.Series({record[key_name]: record["std"] for record in features[name]})
+        assert np.allclose(got.reindex(expected.index).to_numpy(dtype=float), expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("amounts", [[99999.99, 100000.01], [1234567.89, 1234567.90, 1234567.89, 1234567.91]])
+def test_std_of_nearly_equal_amounts(amounts):
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-05"] * len(amounts)),
+        "description": ["WIRE"] * len(amounts),
+        "tag": ["transfer"] * len(amounts),
+        "transaction_amount": amounts,
+    })
+    engine = TransactionFeatureEngine.from_table(df.iloc[:1])
+    engine.update(df.iloc[1:])
+    expected = pd.Series(amounts).std()
+    assert engine.features()["tags"][0]["std"] == pytest.approx(expected, rel=1e-9)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from chrysus.backend.core.transaction_store import TransactionStore, row_fingerprints
+
+
+def _rows(**columns) -> pd.DataFrame:
+    return pd.DataFrame(columns)
+
+
+def test_swapped_debit_credit_rows_are_distinct():
+    table = _rows(
+        date=pd.to_datetime(["2024-01-05", "2024-01-05"]),
+        description=["TRANSFER", "TRANSFER"],
+        debit=[50.0, np.nan],
+        credit=[np.nan, 50.0],
+    )
+    fingerprints = row_fingerprints(table)
+    assert fingerprints[0] != fingerprints[1]
+    assert len(TransactionStore(table)) == 2
+
+
+def test_swapped_numeric_columns_are_distinct():
+    table = _rows(a=[1, 2], b=[2, 1])
+    fingerprints = row_fingerprints(table)
+    assert fingerprints[0] != fingerprints[1]
+
+
+def test_missing_column_matches_null_column():
+    with_null = _rows(date=pd.to_datetime(["2024-01-05"]), amount=[10.0], memo=[None])
+    without = _rows(amount=[10.0], date=pd.to_datetime(["2024-01-05"]))
+    assert row_fingerprints(with_null)[0] == row_fingerprints(without)[0]
+
+
+def test_append_skips_duplicates_and_keeps_date_order():
+    store = TransactionStore(_rows(
+        date=pd.to_datetime(["2024-01-01", "2024-01-03"]),
+        amount=[1.0, 3.0],
+    ))
+    added = store.append(_rows(
+        date=pd.to_datetime(["2024-01-03", "2024-01-02", pd.NaT]),
+        amount=[3.0, 2.0, 4.0],
+    ))
+    assert len(added) == 2
+    assert store.table["amount"].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_amount_fingerprints_the_same_as_int_or_float():
+    as_int = _rows(amount=pd.Series([3, 2500], dtype=object))
+    as_float = _rows(amount=[3.0, 2500.0])
+    assert (row_fingerprints(as_int) == row_fingerprints(as_float)).all()